@@ -0,0 +1,160 @@
+"""Measures how long importing the apworld takes, and which step of it costs the most.\n
+Each run imports the apworld in a fresh python process, against the stub BaseClasses/Options/Utils/worlds in
+benchmark/stubs (or a real Archipelago checkout with --archipelago), one stage at a time:
+loading the tables, the item and location lookups, the region map, Options.py, Meta.py and finally the world class itself.
+The json parsing and the data hooks, which are both part of loading the tables, are then timed again on their own.\n
+The wall time and peak allocation of every stage are printed as JSON.\n
+Usage: python benchmark/import_benchmark.py [--runs 5] [--output bench_output.txt]"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_FOLDER = os.path.dirname(os.path.abspath(__file__))
+WORLD_FOLDER = os.path.join(os.path.dirname(BENCHMARK_FOLDER), "linklink")
+PACKAGE = "worlds.manual_linklink_silasary"
+
+
+def run_stages() -> dict:
+    """Import the apworld stage by stage in this process, and return the time and peak allocation of each stage"""
+    # The package itself is registered without running its __init__.py, so its modules can be imported one at a time.
+    # __init__.py runs last, as the "world" stage
+    spec = importlib.util.spec_from_file_location(PACKAGE, os.path.join(WORLD_FOLDER, "__init__.py"), submodule_search_locations=[WORLD_FOLDER])
+    package = importlib.util.module_from_spec(spec)
+
+    stages = {}
+    modules = {}
+
+    def stage(name: str, action):
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        result = action()
+        seconds = time.perf_counter() - start_time
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        stages[name] = {
+            "seconds": seconds,
+            "peak_bytes": peak_memory - start_memory,
+            "retained_bytes": current_memory - start_memory,
+        }
+        return result
+
+    def import_module(name: str):
+        modules[name] = importlib.import_module(f"{PACKAGE}.{name}")
+
+    def parse_json() -> dict:
+        # the same files Data.py parses. The extra item files are parsed by the item hook itself, so they count as hooks
+        Data = modules["Data"]
+        return {
+            "items": Data.convert_to_list(Data.ManualFile('items.json', list).load(), 'data'),
+            "locations": Data.convert_to_list(Data.ManualFile('locations.json', list).load(), 'data'),
+            "regions": Data.ManualFile('regions.json', dict).load(),
+            "categories": Data.ManualFile('categories.json', dict).load(),
+            "options": Data.ManualFile('options.json', dict).load(),
+            "meta": Data.ManualFile('meta.json', dict).load(),
+        }
+
+    def run_data_hooks(parsed: dict):
+        # These only get what was parsed above, once the world is built, so running them again doesn't change anything it uses
+        Data = modules["Data"]
+        Data.after_load_item_file(parsed["items"])
+        Data.after_load_location_file(parsed["locations"])
+        Data.after_load_region_file(parsed["regions"])
+        Data.after_load_category_file(parsed["categories"])
+        Data.after_load_option_file(parsed["options"])
+        Data.after_load_meta_file(parsed["meta"])
+
+    tracemalloc.start()
+    total_start = time.perf_counter()
+
+    sys.modules[PACKAGE] = package
+    stage("tables", lambda: import_module("Data"))
+    stage("item_lookups", lambda: import_module("Items"))
+    stage("location_lookups", lambda: import_module("Locations"))
+    stage("region_map", lambda: import_module("Regions"))
+    stage("options", lambda: import_module("Options"))
+    stage("meta", lambda: import_module("Meta"))
+    stage("world", lambda: spec.loader.exec_module(package))
+
+    total_seconds = time.perf_counter() - total_start
+    total_peak = tracemalloc.get_traced_memory()[1]
+
+    # the two parts of the tables stage, not counted in the total
+    parsed = stage("json_parse", parse_json)
+    stage("data_hooks", lambda: run_data_hooks(parsed))
+    tracemalloc.stop()
+
+    return {
+        "total_seconds": total_seconds,
+        "total_peak_bytes": total_peak,
+        "stages": stages,
+    }
+
+
+def run_process(archipelago: str | None) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--stages-only"]
+    if archipelago:
+        command += ["--archipelago", archipelago]
+
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"The benchmark process failed:\n{completed.stderr}")
+
+    return json.loads(completed.stdout)
+
+
+def summarize(runs: list[dict]) -> dict:
+    """The median time and the highest peak allocation of every stage over all the runs"""
+    stage_names = list(runs[0]["stages"])
+    return {
+        "runs": len(runs),
+        "total_seconds": statistics.median(run["total_seconds"] for run in runs),
+        "total_peak_bytes": max(run["total_peak_bytes"] for run in runs),
+        "stages": {
+            name: {
+                "seconds": statistics.median(run["stages"][name]["seconds"] for run in runs),
+                "peak_bytes": max(run["stages"][name]["peak_bytes"] for run in runs),
+                "retained_bytes": max(run["stages"][name]["retained_bytes"] for run in runs),
+            }
+            for name in stage_names
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the apworld, stage by stage")
+    parser.add_argument("--runs", type=int, default=5, help="how many fresh processes to measure (default 5)")
+    parser.add_argument("--archipelago", help="path to an Archipelago checkout to import against, instead of the stubs")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--stages-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.archipelago or os.path.join(BENCHMARK_FOLDER, "stubs"))
+
+    if args.stages_only:
+        print(json.dumps(run_stages()))
+        return
+
+    runs = [run_process(args.archipelago) for _ in range(args.runs)]
+
+    report = {
+        "python": sys.version.split()[0],
+        "archipelago": "stubs" if not args.archipelago else args.archipelago,
+        **summarize(runs),
+    }
+
+    report_json = json.dumps(report, indent=2)
+    print(report_json)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Just enough of Archipelago's BaseClasses for the apworld to be imported by the benchmark, nothing here does any work
+from enum import IntFlag
+
+
+class ItemClassification(IntFlag):
+    filler = 0
+    progression = 1
+    useful = 2
+    trap = 4
+    skip_balancing = 8
+    progression_skip_balancing = 9
+
+
+class Item:
+    game = "Generic"
+
+    def __init__(self, name, classification, code, player):
+        self.name = name
+        self.classification = classification
+        self.code = code
+        self.player = player
+
+
+class Location:
+    game = "Generic"
+
+    def __init__(self, player, name="", address=None, parent=None):
+        self.player = player
+        self.name = name
+        self.address = address
+        self.parent_region = parent
+
+
+class Entrance:
+    def __init__(self, player, name="", parent=None):
+        self.player = player
+        self.name = name
+        self.parent_region = parent
+
+
+class Region:
+    def __init__(self, name, player, multiworld):
+        self.name = name
+        self.player = player
+        self.multiworld = multiworld
+
+
+class MultiWorld:
+    pass
+
+
+class CollectionState:
+    additional_init_functions = []
+    additional_copy_functions = []
+
+
+class Tutorial:
+    def __init__(self, *args):
+        self.args = args
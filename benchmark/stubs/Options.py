@@ -0,0 +1,89 @@
+# Just enough of Archipelago's Options for Options.py to build its option classes
+from dataclasses import dataclass
+from enum import IntFlag
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Visibility(IntFlag):
+    none = 0
+    template = 1
+    simple_ui = 2
+    complex_ui = 4
+    spoiler = 8
+    all = 15
+
+
+class Option(Generic[T]):
+    default = 0
+    visibility = Visibility.all
+    rich_text_doc = None
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Toggle(Option):
+    default = 0
+
+
+class DefaultOnToggle(Toggle):
+    default = 1
+
+
+class Choice(Option):
+    options = {}
+    aliases = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.options = {key[7:]: value for key, value in vars(cls).items() if key.startswith("option_")}
+        cls.aliases = {key[6:]: value for key, value in vars(cls).items() if key.startswith("alias_")}
+
+
+class TextChoice(Choice):
+    pass
+
+
+class Range(Option):
+    range_start = 0
+    range_end = 1
+
+
+class NamedRange(Range):
+    special_range_names = {}
+
+
+class FreeText(Option):
+    pass
+
+
+class DeathLink(Toggle):
+    pass
+
+
+class OptionSet(Option):
+    default = frozenset()
+
+
+class StartInventoryPool(Option):
+    pass
+
+
+class OptionGroup:
+    def __init__(self, name, options, start_collapsed=False):
+        self.name = name
+        self.options = options
+        self.start_collapsed = start_collapsed
+
+
+item_and_loc_options = []
+
+
+@dataclass
+class PerGameCommonOptions:
+    pass
+
+
+PerGameCommonOptions.type_hints = {}
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+
+def user_path(*path):
+    return os.path.join(tempfile.gettempdir(), *path)
+
+
+def deprecate(message):
+    raise Exception(message)
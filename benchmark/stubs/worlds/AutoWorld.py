@@ -0,0 +1,50 @@
+# Like the real AutoWorldRegister, this builds the lookups the data package needs when the world class is created,
+# since that's part of what importing the apworld costs
+class AutoWorldRegister(type):
+    world_types = {}
+
+    def __new__(mcs, name, bases, dct):
+        if "item_name_to_id" in dct:
+            dct["item_id_to_name"] = {code: name for name, code in dct["item_name_to_id"].items()}
+            dct["location_id_to_name"] = {code: name for name, code in dct["location_name_to_id"].items()}
+            dct["item_names"] = frozenset(dct["item_name_to_id"])
+            dct["location_names"] = frozenset(dct["location_name_to_id"])
+            dct["item_name_groups"] = {group: frozenset(names) for group, names in dct.get("item_name_groups", {}).items()}
+            dct["location_name_groups"] = {group: frozenset(names) for group, names in dct.get("location_name_groups", {}).items()}
+
+        new_class = super().__new__(mcs, name, bases, dct)
+        if "game" in dct:
+            AutoWorldRegister.world_types[dct["game"]] = new_class
+        return new_class
+
+
+class AutoLogicRegister(type):
+    def __new__(mcs, name, bases, dct):
+        from BaseClasses import CollectionState
+
+        new_class = super().__new__(mcs, name, bases, dct)
+        for key, value in dct.items():
+            if key == "init_mixin":
+                CollectionState.additional_init_functions.append(value)
+            elif key == "copy_mixin":
+                CollectionState.additional_copy_functions.append(value)
+            elif not key.startswith("__"):
+                setattr(CollectionState, key, value)
+        return new_class
+
+
+class LogicMixin(metaclass=AutoLogicRegister):
+    pass
+
+
+class WebWorld:
+    theme = "grass"
+    game_info_languages = ["en"]
+    options_presets = {}
+    option_groups = []
+
+
+class World(metaclass=AutoWorldRegister):
+    def __init__(self, multiworld, player):
+        self.multiworld = multiworld
+        self.player = player
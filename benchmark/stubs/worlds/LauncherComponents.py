@@ -0,0 +1,29 @@
+from enum import Enum
+
+
+class Type(Enum):
+    TOOL = 1
+    MISC = 2
+    CLIENT = 3
+    ADJUSTER = 4
+    HIDDEN = 5
+
+
+class Component:
+    def __init__(self, display_name, script_name=None, frozen_name=None, cli=False, icon="icon", component_type=None,
+                 func=None, file_identifier=None, **kwargs):
+        self.display_name = display_name
+        self.func = func
+
+
+class SuffixIdentifier:
+    def __init__(self, *suffixes):
+        self.suffixes = suffixes
+
+
+components = []
+icon_paths = {}
+
+
+def launch_subprocess(*args, **kwargs):
+    pass
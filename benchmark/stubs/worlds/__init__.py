@@ -0,0 +1,3 @@
+from .AutoWorld import AutoWorldRegister
+
+network_data_package = {"games": {}}
@@ -0,0 +1,10 @@
+def set_rule(spot, rule):
+    spot.access_rule = rule
+
+
+def add_rule(spot, rule, combine="and"):
+    spot.access_rule = rule
+
+
+def forbid_items_for_player(location, items, player):
+    pass
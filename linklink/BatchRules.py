@@ -0,0 +1,216 @@
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from BaseClasses import CollectionState, Location
+
+from .Rules import ALWAYS, Requirement, ConstantRequirement, ItemRequirement, CategoryRequirement, ItemKeywordRequirement, \
+    CategoryKeywordRequirement, AllRequirement, AnyRequirement, NotRequirement, CachedRequirement
+
+if TYPE_CHECKING:
+    from . import ManualWorld
+
+
+def import_numpy():
+    """numpy, or None if it isn't installed. It isn't a requirement of the apworld: without it the batch just calls each rule in turn.\n
+    It's only imported once a batch is made, so loading the apworld (in the Launcher or a client) never pays for importing it"""
+    try:
+        import numpy
+    except ModuleNotFoundError:
+        return None
+    return numpy
+
+
+class LocationRuleBatch:
+    """Checks the access rule of every location of the player against a state in one go, for analysis tools and reachability reports.\n
+    The rules made only of item and category counts are lowered into numpy arrays once:
+    every |Item:N| and |@Category:N| becomes a (column, required count) pair compared against a vector of the counts in state.prog_items,
+    and the ANDs, ORs and NOTs over them are reduced level by level.
+    Any other rule (with requirement functions, dict requires, or set by a hook) is still called as it is, so every answer is the same as the location's own rule.\n
+    Like location.access_rule, this doesn't check whether the location's region can be reached.
+    The rules are read when the batch is made, so make a new one if they're changed afterward."""
+
+    def __init__(self, world: "ManualWorld", locations: Sequence[Location]):
+        self.world = world
+        self.player = world.player
+        self.locations = list(locations)
+        self.rules = [location.access_rule for location in self.locations]
+        self.numpy = import_numpy()
+
+        if self.numpy is not None:
+            self.lower()
+
+    def lower(self):
+        numpy = self.numpy
+        self.item_names: list[str] = [] # the counts vector, in this order
+        item_columns: dict[str, int] = {}
+
+        def item_column(item_name: str) -> int:
+            if item_name not in item_columns:
+                item_columns[item_name] = len(self.item_names)
+                self.item_names.append(item_name)
+            return item_columns[item_name]
+
+        # Every node gets a row in the values array: the count leaves first, then the combinations by how deep they go
+        leaf_columns: list[tuple[str, int]] = [] # ("item", column in the counts vector) or ("category", which category total)
+        leaf_thresholds: list[int] = []
+        self.keyword_leaves: list[tuple[int, Requirement]] = [] # leaves whose threshold depends on the item pool
+        category_columns: dict[tuple[str, ...], int] = {}
+        category_items: list[tuple[int, ...]] = []
+        constant_leaves: list[bool] = []
+        nodes: dict[Requirement, tuple] = {} # requirement -> ("leaf", index) / ("constant", index) / ("all"|"any"|"not", children, height)
+
+        def category_column(item_names: tuple[str, ...]) -> int:
+            if item_names not in category_columns:
+                category_columns[item_names] = len(category_items)
+                category_items.append(tuple(item_column(item_name) for item_name in item_names))
+            return category_columns[item_names]
+
+        def add_leaf(column: tuple[str, int], threshold: int, requirement: Requirement) -> tuple:
+            leaf_columns.append(column)
+            leaf_thresholds.append(threshold)
+            if isinstance(requirement, (ItemKeywordRequirement, CategoryKeywordRequirement)):
+                self.keyword_leaves.append((len(leaf_columns) - 1, requirement))
+            return ("leaf", len(leaf_columns) - 1)
+
+        def add_constant(value: bool) -> tuple:
+            constant_leaves.append(value)
+            return ("constant", len(constant_leaves) - 1)
+
+        def lower_node(requirement: Requirement) -> Optional[tuple]:
+            """The node of the requirement, or None if it can't be lowered"""
+            while isinstance(requirement, CachedRequirement):
+                requirement = requirement.requirement
+            if requirement in nodes:
+                return nodes[requirement]
+
+            if isinstance(requirement, ConstantRequirement):
+                node = add_constant(requirement.value)
+            elif isinstance(requirement, (ItemRequirement, ItemKeywordRequirement)):
+                threshold = requirement.count if isinstance(requirement, ItemRequirement) else 0
+                node = add_leaf(("item", item_column(requirement.item_name)), threshold, requirement)
+            elif isinstance(requirement, (CategoryRequirement, CategoryKeywordRequirement)):
+                if not requirement.item_names:
+                    # An empty category never meets its count, whatever it is
+                    node = add_constant(False)
+                else:
+                    threshold = requirement.count if isinstance(requirement, CategoryRequirement) else 0
+                    if requirement.counter_key is not None:
+                        # the category's own counter in prog_items, read like an item
+                        node = add_leaf(("item", item_column(requirement.counter_key)), threshold, requirement)
+                    else:
+                        node = add_leaf(("category", category_column(tuple(requirement.item_names))), threshold, requirement)
+            elif isinstance(requirement, (AllRequirement, AnyRequirement)):
+                children = [lower_node(part) for part in requirement.requirements]
+                if not children or any(child is None for child in children):
+                    return None
+                kind = "all" if isinstance(requirement, AllRequirement) else "any"
+                node = (kind, children, 1 + max(get_height(child) for child in children))
+            elif isinstance(requirement, NotRequirement):
+                child = lower_node(requirement.requirement)
+                if child is None:
+                    return None
+                node = ("not", [child], 1 + get_height(child))
+            else:
+                return None
+
+            nodes[requirement] = node
+            return node
+
+        def get_height(node: tuple) -> int:
+            return node[2] if node[0] in ("all", "any", "not") else 0
+
+        location_nodes: list[Optional[tuple]] = []
+        for rule in self.rules:
+            if rule is Location.access_rule:
+                location_nodes.append(lower_node(ALWAYS))
+            elif isinstance(rule, Requirement):
+                location_nodes.append(lower_node(rule))
+            else:
+                location_nodes.append(None)
+
+        # Number the nodes: the count leaves, then the constants, then the combinations from the shallowest up
+        leaf_count = len(leaf_columns)
+        combinations = sorted({id(node): node for node in nodes.values() if node[0] in ("all", "any", "not")}.values(), key=get_height)
+        rows: dict[int, int] = {}
+
+        def get_row(node: tuple) -> int:
+            if node[0] == "leaf":
+                return node[1]
+            if node[0] == "constant":
+                return leaf_count + node[1]
+            return rows[id(node)]
+
+        next_row = leaf_count + len(constant_leaves)
+        for node in combinations:
+            rows[id(node)] = next_row
+            next_row += 1
+        self.row_count = next_row
+
+        # Each level is: (rows it fills, "all"|"any"|"not", the rows of the children, where each node's children start)
+        self.levels: list[tuple] = []
+        for height in sorted({node[2] for node in combinations}):
+            for kind in ("all", "any", "not"):
+                level_nodes = [node for node in combinations if node[2] == height and node[0] == kind]
+                if not level_nodes:
+                    continue
+                children = [get_row(child) for node in level_nodes for child in node[1]]
+                starts = numpy.cumsum([0] + [len(node[1]) for node in level_nodes[:-1]])
+                self.levels.append((numpy.array([get_row(node) for node in level_nodes]), kind, numpy.array(children, dtype=numpy.intp), starts))
+
+        self.item_count = len(self.item_names)
+        self.category_items = numpy.array([column for items in category_items for column in items], dtype=numpy.intp)
+        self.category_starts = numpy.cumsum([0] + [len(items) for items in category_items[:-1]]) if category_items else numpy.array([], dtype=numpy.intp)
+        self.leaf_columns = numpy.array([column if kind == "item" else self.item_count + column for kind, column in leaf_columns], dtype=numpy.intp)
+        self.leaf_thresholds = numpy.array(leaf_thresholds, dtype=numpy.int64)
+        self.constants = numpy.array(constant_leaves, dtype=bool)
+        self.keyword_version = None
+
+        self.lowered = numpy.array([node is not None for node in location_nodes], dtype=bool)
+        self.lowered_rows = numpy.array([get_row(node) for node in location_nodes if node is not None], dtype=numpy.intp)
+        self.fallback_indexes = [index for index, node in enumerate(location_nodes) if node is None]
+
+    def update_keyword_thresholds(self):
+        # The keyword requirements have their count already, it only needs copying again when they worked it out again
+        version = self.world.count_keywords.version if self.world.count_keywords is not None else 0
+        if version == self.keyword_version:
+            return
+        for leaf, requirement in self.keyword_leaves:
+            self.leaf_thresholds[leaf] = requirement.count
+        self.keyword_version = version
+
+    def evaluate(self, state: CollectionState) -> Sequence[bool]:
+        """Whether the access rule of each location in self.locations is met in the state, in the same order"""
+        numpy = self.numpy
+        if numpy is None:
+            return [rule(state) for rule in self.rules]
+
+        if self.keyword_leaves:
+            self.update_keyword_thresholds()
+
+        items = state.prog_items[self.player]
+        counts = numpy.fromiter((items.get(item_name, 0) for item_name in self.item_names), dtype=numpy.int64, count=self.item_count)
+        if len(self.category_starts):
+            counts = numpy.concatenate((counts, numpy.add.reduceat(counts[self.category_items], self.category_starts)))
+
+        values = numpy.empty(self.row_count, dtype=bool)
+        leaf_count = len(self.leaf_columns)
+        values[:leaf_count] = counts[self.leaf_columns] >= self.leaf_thresholds
+        values[leaf_count:leaf_count + len(self.constants)] = self.constants
+        for node_rows, kind, children, starts in self.levels:
+            if kind == "all":
+                values[node_rows] = numpy.logical_and.reduceat(values[children], starts)
+            elif kind == "any":
+                values[node_rows] = numpy.logical_or.reduceat(values[children], starts)
+            else:
+                values[node_rows] = ~values[children]
+
+        results = numpy.empty(len(self.locations), dtype=bool)
+        results[self.lowered] = values[self.lowered_rows]
+        for index in self.fallback_indexes:
+            results[index] = self.rules[index](state)
+        return results
+
+    def evaluate_by_name(self, state: CollectionState) -> dict[str, bool]:
+        results = self.evaluate(state)
+        if self.numpy is not None:
+            results = results.tolist()
+        return dict(zip((location.name for location in self.locations), results))
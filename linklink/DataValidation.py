@@ -1,6 +1,7 @@
 import logging
 import re
 import json
+from collections import Counter
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, ItemClassification
 
@@ -312,11 +313,12 @@ class DataValidation():
 
     @staticmethod
     def checkForDuplicateLocationNames():
-        for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
+        # counted in one pass, since the generated linklink locations make the table far too big to rescan per location
+        name_counts = Counter(location["name"] for location in DataValidation.location_table)
 
+        for name, name_count in name_counts.items():
             if name_count > 1:
-                raise ValidationError("Location %s is defined more than once." % (location["name"]))
+                raise ValidationError("Location %s is defined more than once." % (name))
 
     @staticmethod
     def checkForDuplicateRegionNames():
@@ -6,8 +6,10 @@ import json
 
 from BaseClasses import MultiWorld, Item
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
-from types import GenericAlias
+from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any, NamedTuple
+from types import GenericAlias, MappingProxyType
+from collections import Counter
+from collections.abc import Mapping
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
 
@@ -173,6 +175,81 @@ def get_items_with_value(world: World, multiworld: MultiWorld, value: str, playe
     return world.item_values[player].get(value)
 
 
+class CategoryItems(NamedTuple):
+    item_names: tuple[str, ...]
+    pool_count: int
+
+class CategoryCounters:
+    """The key of each category's counter in state.prog_items, which ManualWorld.collect and remove keep up to date
+    so a category requirement is a single lookup.\n
+    It only depends on the item table, not on the pool, so it's built once per world and kept."""
+
+    def __init__(self, item_name_to_item: Mapping[str, Any]):
+        item_categories = {item["name"]: tuple(dict.fromkeys(item.get("category", []))) for item in item_name_to_item.values()}
+
+        # Two categories can end up with the same key (like "Key Items" and "key_items"), those don't get a counter
+        categories_by_key: dict[str, list[str]] = {}
+        for category in dict.fromkeys(category for categories in item_categories.values() for category in categories):
+            categories_by_key.setdefault(format_state_prog_items_key(ProgItemsCat.CATEGORY, category), []).append(category)
+        self.counter_keys: dict[str, str] = {categories[0]: key for key, categories in categories_by_key.items()
+                                             if len(categories) == 1 and key not in item_name_to_item}
+
+        # item name -> the counter keys of its categories, for the items that are in any category with a counter
+        self.item_counter_keys: dict[str, tuple[str, ...]] = {}
+        for item_name, categories in item_categories.items():
+            keys = tuple(self.counter_keys[category] for category in categories if category in self.counter_keys)
+            if keys:
+                self.item_counter_keys[item_name] = keys
+
+    def get_counter_key(self, category: str) -> Optional[str]:
+        """The key of the category's counter in state.prog_items, or None if it doesn't have one"""
+        return self.counter_keys.get(category)
+
+class CategoryIndex(Mapping):
+    """Read-only category name -> CategoryItems(item names, pool count) index, built once the pool is known.\n
+    The pool count is how many of the category's items are in the items_counts it's built from
+    (usually world.get_item_counts(only_progression=True)), so a category can be looked up without going through every item.\n
+    It also has the CategoryCounters of the items, which don't change with the pool and can be passed in to be shared."""
+
+    def __init__(self, item_name_to_item: Mapping[str, Any], items_counts: Mapping[str, int], counters: Optional[CategoryCounters] = None):
+        self.items_counts = Counter(items_counts) # a copy, so the counts being edited in place after this doesn't go unnoticed
+        self.counters = counters if counters is not None else CategoryCounters(item_name_to_item)
+
+        category_items: dict[str, list[str]] = {}
+        for item in item_name_to_item.values():
+            for category in dict.fromkeys(item.get("category", [])):
+                category_items.setdefault(category, []).append(item["name"])
+
+        self.categories = MappingProxyType({
+            category: CategoryItems(tuple(item_names), sum(items_counts.get(item_name, 0) for item_name in item_names))
+            for category, item_names in category_items.items()
+        })
+
+    def __getitem__(self, category: str) -> CategoryItems:
+        return self.categories[category]
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def get_counter_key(self, category: str) -> Optional[str]:
+        """The key of the category's counter in state.prog_items, or None if it doesn't have one"""
+        return self.counters.get_counter_key(category)
+
+    def get_item_names(self, category: str) -> tuple[str, ...]:
+        entry = self.categories.get(category)
+        return entry.item_names if entry is not None else ()
+
+    def get_pool_count(self, category: str, items_counts: Optional[Mapping[str, int]] = None) -> int:
+        """How many items of the category are in items_counts, which is only counted again if it isn't the same as the counts the index was built from"""
+        if items_counts is None or items_counts == self.items_counts:
+            entry = self.categories.get(category)
+            return entry.pool_count if entry is not None else 0
+        return sum(items_counts.get(item_name, 0) for item_name in self.get_item_names(category))
+
+
 def filter_used_regions(player_regions: dict|list) -> set:
     """Return a set of regions that are actually used in Generation. It includes region that have no locations but are required by other regions\n
     The dict version of the player_regions must be in the format: dict(region name str: region)
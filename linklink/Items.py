@@ -1,6 +1,7 @@
 from BaseClasses import Item
 from .Data import item_table
 from .Game import filler_item_name, starting_index
+from .Records import ItemRecord
 
 
 ######################
@@ -8,7 +9,7 @@ from .Game import filler_item_name, starting_index
 ######################
 
 item_id_to_name: dict[int, str] = {}
-item_name_to_item: dict[str, dict] = {}
+item_name_to_item: dict[str, ItemRecord] = {}
 item_name_groups: dict[str, str] = {}
 advancement_item_names: set[str] = set()
 lastItemId = -1
@@ -34,10 +35,17 @@ for key, val in enumerate(item_table):
     item_table[key]["progression"] = val["progression"] if "progression" in val else False
     if isinstance(val.get("category", []), str):
         item_table[key]["category"] = [val["category"]]
-        
+
     count += 1
 
-for item in item_table:
+for key, item in enumerate(item_table):
+    #Just lowercase the values here to remove all the .lower.strip down the line
+    item['value'] = {k.lower().strip(): v
+                     for k, v in item.get('value', {}).items()}
+
+    # Done changing the item, so it can become its compact read-only record
+    item = item_table[key] = ItemRecord(item)
+
     item_name = item["name"]
     item_id_to_name[item["id"]] = item_name
     item_name_to_item[item_name] = item
@@ -50,10 +58,6 @@ for item in item_table:
             item_name_groups[c] = []
         item_name_groups[c].append(item_name)
 
-    #Just lowercase the values here to remove all the .lower.strip down the line
-    item['value'] = {k.lower().strip(): v
-                     for k, v in item.get('value', {}).items()}
-
     for v in item.get("value", {}).keys():
         group_name = f"has_{v}_value"
         if group_name not in item_name_groups:
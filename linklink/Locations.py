@@ -1,6 +1,10 @@
+from collections import ChainMap
+from collections.abc import Sequence
+
 from BaseClasses import Location
 from .Data import location_table
 from .Game import starting_index
+from .Records import LocationRecord
 
 
 ######################
@@ -10,27 +14,42 @@ from .Game import starting_index
 count = starting_index
 victory_names: list[str] = []
 
-# add sequential generated ids to the lists
-for key, _ in enumerate(location_table):
-    if "victory" in location_table[key] and location_table[key]["victory"]:
-        victory_names.append(location_table[key]["name"])
+# Hooks can give back a location_table whose generated locations are computed on demand (see hooks/LinkLink.py)
+# Those don't store anything: they get told where their block of sequential ids starts, and every lookup
+# on them (id, name, record) is worked out from that, so only the hand-written locations go through the loops below
+generated = getattr(location_table, "generated", None)
+generated_range = range(location_table.generated_start, location_table.generated_start + len(generated)) if generated is not None else range(0)
 
-    if "id" in location_table[key]:
-        item_id = location_table[key]["id"]
+# add sequential generated ids to the lists
+key = 0
+while key < len(location_table):
+    if key == generated_range.start and generated_range:
+        generated.first_id = count
+        count += len(generated_range)
+        key = generated_range.stop
+        continue
+
+    location = location_table[key]
+    if "victory" in location and location["victory"]:
+        victory_names.append(location["name"])
+
+    if "id" in location:
+        item_id = location["id"]
         if item_id >= count:
             count = item_id
         else:
-            raise ValueError(f"{location_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+            raise ValueError(f"{location['name']} has an invalid ID. ID must be at least {count + 1}")
 
-    location_table[key]["id"] = count
+    location["id"] = count
 
-    if "region" not in location_table[key]:
-        location_table[key]["region"] = "Manual" # all locations are in the same region for Manual
+    if "region" not in location:
+        location["region"] = "Manual" # all locations are in the same region for Manual
 
-    if isinstance(location_table[key].get("category", []), str):
-        location_table[key]["category"] = [location_table[key]["category"]]
+    if isinstance(location.get("category", []), str):
+        location["category"] = [location["category"]]
 
     count += 1
+    key += 1
 
 if not victory_names:
     # Add the game completion location, which will have the Victory item assigned to it automatically
@@ -44,10 +63,15 @@ if not victory_names:
     victory_names.append("__Manual Game Complete__")
 
 location_id_to_name: dict[int, str] = {}
-location_name_to_location: dict[str, dict] = {}
-location_name_groups: dict[str, list[str]] = {}
+location_name_to_location: dict[str, LocationRecord] = {}
+location_name_groups: dict[str, Sequence[str]] = {}
 
-for item in location_table:
+for key in range(len(location_table)):
+    if key in generated_range:
+        continue
+
+    # Done changing the location, so it can become its compact read-only record
+    item = location_table[key] = LocationRecord(location_table[key])
     location_id_to_name[item["id"]] = item["name"]
     location_name_to_location[item["name"]] = item
 
@@ -56,10 +80,35 @@ for item in location_table:
             location_name_groups[c] = []
         location_name_groups[c].append(item["name"])
 
-
 # location_id_to_name[None] = "__Manual Game Complete__"
 location_name_to_id = {name: id for id, name in location_id_to_name.items()}
 
+if generated is not None:
+    # each generated location is only in the group of its own item. The group is only its range of locations,
+    # so the names aren't made until something reads it
+    for item_index, item in enumerate(generated.items):
+        if item["count"] > 0:
+            group = generated.item_group(item_index)
+            if item["name"] in location_name_groups:
+                # shared with other locations of the same category, so it has to be a plain list
+                location_name_groups[item["name"]] = [*location_name_groups[item["name"]], *group]
+            else:
+                location_name_groups[item["name"]] = group
+
+    location_id_to_name = ChainMap(location_id_to_name, generated.names_by_id())
+    location_name_to_id = ChainMap(location_name_to_id, generated.ids_by_name())
+    location_name_to_location = ChainMap(location_name_to_location, generated.by_name())
+
+def get_location_name_to_id() -> dict[str, int]:
+    """location_name_to_id as a plain dict, for the world class (the data package gets json encoded, which needs a real one).\n
+    The generated locations are added straight from their names and their block of ids, without looking up each name."""
+    if generated is None:
+        return dict(location_name_to_id)
+
+    names_to_ids = dict(zip(generated.names(), generated.ids()))
+    names_to_ids.update(location_name_to_id.maps[0])
+    return names_to_ids
+
 ######################
 # Location classes
 ######################
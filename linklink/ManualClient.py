@@ -104,6 +104,9 @@ class ManualContext(SuperContext):
 
         self.send_index: int = 0
         self.syncing = False
+        # The world's items and locations are read-only records, so the client keeps a copy of each one it looks up
+        # without a .apmanual file loaded, and changes that instead (like the categories it adds for hints)
+        self.world_records: dict[tuple[str, str, str], dict[str, Any]] = {}
         self.game = game
         self.username = player_name
 
@@ -148,7 +151,7 @@ class ManualContext(SuperContext):
         location = self.location_table.get(name)
         if not location:
             # It is absolutely possible to pull categories from the data_package via self.update_game. I have not done this yet.
-            location = AutoWorldRegister.world_types[self.game].location_name_to_location.get(name, {"name": name})
+            location = self.get_world_record("location", name, AutoWorldRegister.world_types[self.game].location_name_to_location)
         return location
 
     def get_location_by_id(self, id) -> dict[str, Any]:
@@ -158,9 +161,17 @@ class ManualContext(SuperContext):
     def get_item_by_name(self, name):
         item = self.item_table.get(name)
         if not item:
-            item = AutoWorldRegister.world_types[self.game].item_name_to_item.get(name, {"name": name})
+            item = self.get_world_record("item", name, AutoWorldRegister.world_types[self.game].item_name_to_item)
         return item
 
+    def get_world_record(self, kind: str, name: str, records: dict) -> dict[str, Any]:
+        """A copy of the world's record of this item or location that the client can change, the same one every time it's asked for"""
+        key = (self.game, kind, name)
+        if key not in self.world_records:
+            record = records.get(name, {"name": name})
+            self.world_records[key] = {field: list(value) if isinstance(value, list) else value for field, value in record.items()}
+        return self.world_records[key]
+
     def get_item_by_id(self, id):
         name = self.item_names.lookup_in_game(id)
         return self.get_item_by_name(name)
@@ -0,0 +1,103 @@
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+
+class ManualRecord(Mapping):
+    """Base of the item, location and region records the tables are turned into once they're loaded.\n
+    The usual keys of each kind of record are kept in __slots__ and anything else (like keys added by hooks) in `extra`,
+    so thousands of them take a lot less memory than the dicts they're made from.\n
+    Records read like those dicts (record["name"], record.get("category", []), "requires" in record, dict(record))
+    and the usual keys can also be read as attributes (record.name), but they can't be changed after they're built."""
+    __slots__ = ("extra",)
+    fields: tuple[str, ...] = ()
+    field_set: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.field_set = frozenset(cls.fields)
+
+    def __init__(self, data: Mapping[str, Any]):
+        extra = None
+        for key, value in data.items():
+            if key in self.field_set:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, "extra", extra)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.field_set:
+            return hasattr(self, key)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.fields:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for key in self.fields if hasattr(self, key)) + (len(self.extra) if self.extra is not None else 0)
+
+    def __bool__(self) -> bool:
+        return self.extra is not None or any(hasattr(self, key) for key in self.fields)
+
+    def __setitem__(self, key: str, value: Any):
+        raise TypeError(f"{type(self).__name__} can't be changed after loading, tried to set '{key}'")
+
+    def __delitem__(self, key: str):
+        raise TypeError(f"{type(self).__name__} can't be changed after loading, tried to remove '{key}'")
+
+    def __setattr__(self, key: str, value: Any):
+        raise TypeError(f"{type(self).__name__} can't be changed after loading, tried to set '{key}'")
+
+    def __delattr__(self, key: str):
+        raise TypeError(f"{type(self).__name__} can't be changed after loading, tried to remove '{key}'")
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class ItemRecord(ManualRecord):
+    fields = ("name", "id", "count", "category", "value", "progression", "progression_skip_balancing", "useful", "trap", "filler",
+              "early", "local", "local_early", "linklink")
+    __slots__ = fields
+
+
+class LocationRecord(ManualRecord):
+    fields = ("name", "id", "region", "category", "requires", "victory", "place_item", "place_item_category",
+              "dont_place_item", "dont_place_item_category", "hint_entrance", "prehint", "hidden", "linklink")
+    __slots__ = fields
+
+
+class RegionRecord(ManualRecord):
+    fields = ("name", "is_region", "requires", "connects_to", "starting", "entrance_requires", "exit_requires")
+    __slots__ = fields
+
+
+class RuleContext(ManualRecord):
+    """The part of a location or region (or the {"requires": ...} of an entrance) that its compiled rule keeps for its error messages.\n
+    Made when the rules are compiled, from anything that isn't already a record, so checking a rule never reads
+    a dict that something else could be changing, and never writes anything to it."""
+    fields = ("name", "is_region", "starting", "connects_to", "region", "category", "requires")
+    __slots__ = fields
+
+    @classmethod
+    def from_area(cls, area: Mapping[str, Any]) -> "RuleContext":
+        return cls({key: area[key] for key in cls.fields if key in area})
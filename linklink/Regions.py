@@ -1,26 +1,36 @@
 from BaseClasses import Entrance, MultiWorld, Region
 from .Helpers import is_category_enabled, is_location_enabled
 from .Data import region_table
-from .Locations import ManualLocation, location_name_to_location
+from .Locations import ManualLocation
+from .Records import RegionRecord
 from worlds.AutoWorld import World
 
 
 if not region_table:
     region_table = {}
 
-regionMap = { **region_table }
+# the name and is_region are part of the record, for the logic error messages
+regionMap = { name: RegionRecord({ **region, "name": name, "is_region": True }) for name, region in region_table.items() }
 starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
 
 if len(starting_regions) == 0:
-    starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
+    starting_regions = list(region_table.keys()) # the Manual region connects to all user-defined regions automatically if you specify no starting regions
 
-regionMap["Manual"] = {
+regionMap["Manual"] = RegionRecord({
+    "name": "Manual",
+    "is_region": True,
     "requires": [],
     "connects_to": starting_regions
-}
+})
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    # Group the locations by region once, instead of going through the whole location_table for every region
+    region_locations = {}
+    for location in world.location_table:
+        if "region" in location:
+            region_locations.setdefault(location["region"], []).append(location)
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -33,10 +43,9 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
             exit_array = None
 
         locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        for location in region_locations.get(region, []):
+            if is_location_enabled(multiworld, player, location):
+                locations.append(location["name"])
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -60,7 +69,7 @@ def create_region(world: World, multiworld: MultiWorld, player: int, name: str,
         for location in locations:
             loc_id = world.location_name_to_id.get(location, 0)
             locationObj = ManualLocation(player, location, loc_id, ret)
-            if location_name_to_location[location].get('prehint'):
+            if world.location_name_to_location[location].get('prehint'):
                 world.options.start_location_hints.value.add(location)
             ret.locations.append(locationObj)
     if exits:
@@ -0,0 +1,146 @@
+import logging
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from BaseClasses import CollectionState
+
+if TYPE_CHECKING:
+    from . import ManualWorld
+
+# Set MANUAL_PROFILE_RULES=1 to time every rule set_rules installs, and log the ones that took the longest at the end of generate_output
+# (and again after the spoiler playthrough, for the calls made since). Set it to a file path instead to append the reports to that file.
+# When it isn't set the rules are installed as they are, so it costs nothing
+PROFILE_RULES = os.environ.get("MANUAL_PROFILE_RULES", "")
+PROFILING_ENABLED = PROFILE_RULES.lower() not in ("", "0", "false", "no")
+
+# How many of the slowest rules the logged report lists, the file gets all of them
+REPORT_LOG_LIMIT = 30
+
+# Archipelago functions that show which part of generation a rule is checked in, looked for up the stack from the rule.
+# When several are on the stack the first phase here wins, so a sweep done while filling counts as a sweep
+PHASE_FUNCTIONS = {
+    "create_playthrough": "playthrough",
+    "balance_multiworld_progression": "balancing",
+    "sweep_for_advancements": "sweep",
+    "sweep_for_events": "sweep",
+    "sweep_from_pool": "sweep",
+    "fill_restrictive": "fill",
+    "remaining_fill": "fill",
+    "distribute_items_restrictive": "fill",
+    "distribute_early_items": "fill",
+    "accessibility_corrections": "fill",
+}
+PHASES = list(dict.fromkeys(PHASE_FUNCTIONS.values()))
+
+
+def get_phase() -> str:
+    found = set()
+    frame = sys._getframe(2)
+    while frame is not None:
+        phase = PHASE_FUNCTIONS.get(frame.f_code.co_name)
+        if phase is not None:
+            found.add(phase)
+        frame = frame.f_back
+
+    for phase in PHASES:
+        if phase in found:
+            return phase
+    return "other"
+
+
+class RuleStats:
+    __slots__ = ("name", "calls", "seconds", "cache_hits", "cached", "phases")
+
+    def __init__(self, name: str, cached: bool):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.cache_hits = 0
+        self.cached = cached
+        self.phases: dict[str, int] = {}
+
+
+class ProfiledRule:
+    """Stands in for a rule while profiling, recording its calls in its RuleStats"""
+    __slots__ = ("rule", "stats", "player")
+
+    def __init__(self, rule: Callable[[CollectionState], bool], stats: RuleStats, player: int):
+        self.rule = rule
+        self.stats = stats
+        self.player = player
+
+    def __call__(self, state: CollectionState) -> bool:
+        stats = self.stats
+        if stats.cached and self.rule in state.manual_rule_results[self.player]:
+            stats.cache_hits += 1
+
+        phase = get_phase()
+        stats.phases[phase] = stats.phases.get(phase, 0) + 1
+
+        start = time.perf_counter()
+        try:
+            return self.rule(state)
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+
+
+class RuleProfiler:
+    """Keeps the RuleStats of the location, region and entrance rules of one player, made by set_rules when MANUAL_PROFILE_RULES is set"""
+
+    def __init__(self, world: "ManualWorld"):
+        self.world = world
+        self.stats: dict[str, RuleStats] = {}
+        self.rules: dict[str, ProfiledRule] = {}
+
+    def wrap(self, name: str, rule: Callable[[CollectionState], bool]) -> ProfiledRule:
+        """The profiled stand-in for rule, shared by everything installed under the same name (like every entrance into a region)"""
+        from .Rules import CachedRequirement
+
+        if name not in self.rules:
+            self.stats[name] = RuleStats(name, isinstance(rule, CachedRequirement))
+            self.rules[name] = ProfiledRule(rule, self.stats[name], self.world.player)
+        return self.rules[name]
+
+    def get_report(self, title: str, limit: Optional[int] = None) -> str:
+        used = sorted((stats for stats in self.stats.values() if stats.calls), key=lambda stats: stats.seconds, reverse=True)
+        total_calls = sum(stats.calls for stats in used)
+        total_seconds = sum(stats.seconds for stats in used)
+
+        lines = [f"Manual rule profile of {self.world.multiworld.get_player_name(self.world.player)} ({self.world.game}), {title}: "
+                 f"{total_calls} calls of {len(used)} rules in {total_seconds:.3f}s"]
+        phase_calls = {}
+        for stats in used:
+            for phase, calls in stats.phases.items():
+                phase_calls[phase] = phase_calls.get(phase, 0) + calls
+        if phase_calls:
+            lines.append("  calls by phase: " + ", ".join(f"{phase} {calls}" for phase, calls in sorted(phase_calls.items(), key=lambda entry: -entry[1])))
+
+        lines.append(f"  {'seconds':>9} {'calls':>9} {'us/call':>8} {'cached':>7}  rule (phases)")
+        for stats in used[:limit]:
+            hit_rate = f"{stats.cache_hits / stats.calls:.0%}" if stats.cached else "-"
+            phases = ", ".join(f"{phase} {calls}" for phase, calls in sorted(stats.phases.items(), key=lambda entry: -entry[1]))
+            lines.append(f"  {stats.seconds:9.4f} {stats.calls:9} {stats.seconds / stats.calls * 1e6:8.1f} {hit_rate:>7}  {stats.name} ({phases})")
+        if limit is not None and len(used) > limit:
+            lines.append(f"  ... and {len(used) - limit} more")
+        return "\n".join(lines)
+
+    def dump(self, title: str):
+        """Log (or write to the MANUAL_PROFILE_RULES file) the report of the calls so far, then start counting again"""
+        if not any(stats.calls for stats in self.stats.values()):
+            return
+
+        if PROFILE_RULES.lower() in ("1", "true", "yes"):
+            logging.info(self.get_report(title, REPORT_LOG_LIMIT))
+        else:
+            try:
+                with open(PROFILE_RULES, "a", encoding="utf-8") as f:
+                    f.write(self.get_report(title) + "\n\n")
+            except OSError as e:
+                logging.warning(f"Manual: Could not write the rule profile to {PROFILE_RULES}: {e}")
+                logging.info(self.get_report(title, REPORT_LOG_LIMIT))
+
+        for name, stats in self.stats.items():
+            self.stats[name] = self.rules[name].stats = RuleStats(name, stats.cached)
@@ -1,14 +1,18 @@
+from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Optional
+from collections import Counter, defaultdict
 from enum import IntEnum
 from operator import eq, ge, le
 
 from .Regions import regionMap
 from .hooks import Rules
+from .Records import ManualRecord, RuleContext
+from .RuleProfiler import PROFILING_ENABLED, RuleProfiler
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat, CategoryIndex
 
-from BaseClasses import MultiWorld, CollectionState
-from worlds.AutoWorld import World
+from BaseClasses import MultiWorld, CollectionState, Entrance, Location
+from worlds.AutoWorld import World, LogicMixin
 from worlds.generic.Rules import set_rule, add_rule
 from Options import Choice, Toggle, Range, NamedRange
 
@@ -101,63 +105,1043 @@ def evaluate_postfix(expr: str, location: str) -> bool:
 
     return stack.pop()
 
-def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
+REQUIRES_FUNCTION = re.compile(r'\{(\w+)\((.*?)\)\}')
+REQUIRES_TOKEN = re.compile(r'\|[^|]+\|')
+REQUIRES_AND = re.compile(r'\s?\bAND\b\s?', re.IGNORECASE)
+REQUIRES_OR = re.compile(r'\s?\bOR\b\s?', re.IGNORECASE)
 
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player, only_progression=True)
+# While compiling, each |item| is swapped for one of these characters instead of the 1 or 0 the string evaluator would put there.
+# They are word characters that aren't numbers, like a 1 or 0 would be for the AND/OR regexes, but no requires should contain them
+PLACEHOLDER_START = 0xAC00
+PLACEHOLDER_COUNT = 11172
+REQUIRES_PLACEHOLDER = re.compile('[\uac00-\ud7a3]')
+# A placeholder with pipes on both sides: where the string evaluator put a 1 or 0 instead, an |item| with a 1 or 0 in it could match there
+ENCLOSED_PLACEHOLDER = re.compile('\\|[^|]*[\uac00-\ud7a3][^|]*\\|')
 
-        # Preparing some variables for exception messages
-        area_type = "region" if area.get("is_region",False) else "location"
-        area_name = area.get("name", f"unknown with these parameters: {area}")
+# How many of the texts left by the {functions} of a requires are kept compiled
+MAX_COMPILED_FUNCTION_RESULTS = 64
+
+# What a call to a requirement function costs next to checking one item (see Requirement.get_cost)
+FUNCTION_COST = 50
+
+
+def is_count_keyword(item_count: str) -> bool:
+    return item_count.lower() in ('all', 'half') or (item_count.endswith('%') and len(item_count) > 1)
+
+def resolve_count_keyword(item_count: str, pool_count: int) -> int:
+    """The count that 'all', 'half' or 'N%' stands for, when there's pool_count of the item (or category) in the pool"""
+    if item_count.lower() == 'all':
+        return pool_count
+    elif item_count.lower() == 'half':
+        return int(pool_count / 2)
+    else:
+        percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+        return math.ceil(pool_count * percent)
+
+
+# These ask for the CollectionState but never use it, so like the functions that don't ask for it,
+# they give the same result for a player every time and get folded into the requires when they're compiled
+STATE_INDEPENDENT_FUNCTIONS = {"YamlCompare"}
+
+# Stands in for the CollectionState in the arguments of a binding plan, until the function is called with one
+STATE_ARGUMENT = object()
+
+def get_requirement_function(func_name: str):
+    """The requirement function called func_name, from this file or else hooks/Rules.py"""
+    func = globals().get(func_name)
+
+    if func is None:
+        func = getattr(Rules, func_name, None)
+
+    return func
+
+def is_state_dependent(func_name: str, func) -> bool:
+    """Can this requirement function give a different result for a different CollectionState?
+    Only the ones that ask for the state can (besides the ones in STATE_INDEPENDENT_FUNCTIONS)."""
+    if func_name in STATE_INDEPENDENT_FUNCTIONS:
+        return False
+
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return True
+
+    return any(parameter.annotation == CollectionState for parameter in parameters.values())
+
+def replace_function_call(requires: str, func_name: str, func_args: str, result) -> str:
+    """Put the result of a {function} in the requires in place of its call, like the string evaluator does"""
+    if isinstance(result, bool):
+        return requires.replace("{" + func_name + "(" + func_args + ")}", "1" if result else "0")
+    else:
+        return requires.replace("{" + func_name + "(" + func_args + ")}", str(result))
+
+
+# set_rules compiles every requires once into a tree of these, so an access check doesn't have to parse the requires again.
+# They're called with the CollectionState like any other access rule
+class Requirement(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def __call__(self, state: CollectionState) -> bool:
+        ...
+
+    def get_key(self) -> Optional[tuple]:
+        """What makes two of these the same requirement, for RuleCompiler.intern(). None for one that can't be shared"""
+        return None
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        """The names of the items whose count in the state this reads, for RuleDependencies. None if it can read anything else"""
+        return None
+
+    def get_cost(self) -> int:
+        """Roughly how much checking this costs, so the parts of an AND or OR can be checked cheapest first"""
+        return FUNCTION_COST
+
+
+class ConstantRequirement(Requirement):
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def __call__(self, state: CollectionState) -> bool:
+        return self.value
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return frozenset()
+
+    def get_cost(self) -> int:
+        return 0
+
+    def __repr__(self) -> str:
+        return "ALWAYS" if self.value else "NEVER"
+
+
+ALWAYS = ConstantRequirement(True)
+NEVER = ConstantRequirement(False)
+
+
+class ItemRequirement(Requirement):
+    """|Item:N|"""
+    __slots__ = ("item_name", "player", "count")
+
+    def __init__(self, item_name: str, player: int, count: int):
+        self.item_name = item_name
+        self.player = player
+        self.count = count
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.prog_items[self.player][self.item_name] >= self.count
+
+    def get_key(self) -> Optional[tuple]:
+        return ("item", self.item_name, self.count)
+
+    def get_cost(self) -> int:
+        return 1
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return frozenset((self.item_name,))
+
+    def __repr__(self) -> str:
+        return f"|{self.item_name}:{self.count}|"
+
+
+class CategoryRequirement(Requirement):
+    """|@Category:N|, met by any mix of the items in the category.
+    Reads the category's counter in state.prog_items when it has one (see CategoryIndex), or else adds up the items"""
+    __slots__ = ("category_name", "item_names", "player", "count", "counter_key")
+
+    def __init__(self, category_name: str, item_names: tuple[str, ...], player: int, count: int, counter_key: Optional[str] = None):
+        self.category_name = category_name
+        self.item_names = item_names
+        self.player = player
+        self.count = count
+        self.counter_key = counter_key
+
+    def __call__(self, state: CollectionState) -> bool:
+        if self.counter_key is not None:
+            return state.prog_items[self.player][self.counter_key] >= self.count
+
+        items = state.prog_items[self.player]
+        total = 0
+        for item_name in self.item_names:
+            total += items[item_name]
+            if total >= self.count:
+                return True
+        return False
+
+    def get_key(self) -> Optional[tuple]:
+        return ("category", self.category_name, self.count)
+
+    def get_cost(self) -> int:
+        return 1 if self.counter_key is not None else len(self.item_names)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return frozenset(self.item_names)
+
+    def __repr__(self) -> str:
+        return f"|@{self.category_name}:{self.count}|"
+
+
+class ItemKeywordRequirement(Requirement):
+    """|Item:all|, |Item:half| or |Item:N%|, out of how many of the item are in the pool.
+    The count is worked out when it's made, and again by CountKeywords.resolve() if the item counts change"""
+    __slots__ = ("world", "item_name", "player", "keyword", "count")
+
+    def __init__(self, world: "ManualWorld", item_name: str, player: int, keyword: str):
+        self.world = world
+        self.item_name = item_name
+        self.player = player
+        self.keyword = keyword
+        self.resolve(world.get_item_counts(player, only_progression=True))
+
+    def resolve(self, items_counts: Counter[str]):
+        self.count = resolve_count_keyword(self.keyword, items_counts.get(self.item_name, 0))
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.prog_items[self.player][self.item_name] >= self.count
+
+    def get_key(self) -> Optional[tuple]:
+        return ("item", self.item_name, self.keyword.lower())
+
+    def get_cost(self) -> int:
+        return 2
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return frozenset((self.item_name,))
+
+    def __repr__(self) -> str:
+        return f"|{self.item_name}:{self.keyword}|"
+
+
+class CategoryKeywordRequirement(Requirement):
+    """|@Category:all|, |@Category:half| or |@Category:N%|, out of how many items of the category are in the pool.
+    The count is worked out when it's made, and again by CountKeywords.resolve() if the item counts change"""
+    __slots__ = ("world", "category_index", "category_name", "item_names", "player", "keyword", "counter_key", "count")
+
+    def __init__(self, world: "ManualWorld", category_index: CategoryIndex, category_name: str, player: int, keyword: str):
+        self.world = world
+        self.category_index = category_index
+        self.category_name = category_name
+        self.item_names = category_index.get_item_names(category_name)
+        self.player = player
+        self.keyword = keyword
+        self.counter_key = category_index.get_counter_key(category_name)
+        self.resolve(world.get_item_counts(player, only_progression=True))
+
+    def resolve(self, items_counts: Counter[str]):
+        self.count = resolve_count_keyword(self.keyword, self.category_index.get_pool_count(self.category_name, items_counts))
+
+    def __call__(self, state: CollectionState) -> bool:
+        count = self.count
+        if self.counter_key is not None:
+            return state.prog_items[self.player][self.counter_key] >= count
+
+        items = state.prog_items[self.player]
+        total = 0
+        for item_name in self.item_names:
+            total += items[item_name]
+            if total >= count:
+                return True
+        return False
+
+    def get_key(self) -> Optional[tuple]:
+        return ("category", self.category_name, self.keyword.lower())
+
+    def get_cost(self) -> int:
+        return 2 if self.counter_key is not None else len(self.item_names) + 2
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return frozenset(self.item_names)
+
+    def __repr__(self) -> str:
+        return f"|@{self.category_name}:{self.keyword}|"
+
+
+class AllRequirement(Requirement):
+    __slots__ = ("requirements",)
+
+    def __init__(self, requirements: tuple[Requirement, ...]):
+        self.requirements = requirements
+
+    def __call__(self, state: CollectionState) -> bool:
+        for requirement in self.requirements:
+            if not requirement(state):
+                return False
+        return True
+
+    def get_key(self) -> Optional[tuple]:
+        return ("all", self.requirements)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return combine_item_names(self.requirements)
+
+    def get_cost(self) -> int:
+        return sum(requirement.get_cost() for requirement in self.requirements)
+
+    def __repr__(self) -> str:
+        return "(" + " AND ".join(repr(requirement) for requirement in self.requirements) + ")"
+
+
+class AnyRequirement(Requirement):
+    __slots__ = ("requirements",)
+
+    def __init__(self, requirements: tuple[Requirement, ...]):
+        self.requirements = requirements
+
+    def __call__(self, state: CollectionState) -> bool:
+        for requirement in self.requirements:
+            if requirement(state):
+                return True
+        return False
+
+    def get_key(self) -> Optional[tuple]:
+        return ("any", self.requirements)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return combine_item_names(self.requirements)
+
+    def get_cost(self) -> int:
+        return sum(requirement.get_cost() for requirement in self.requirements)
+
+    def __repr__(self) -> str:
+        return "(" + " OR ".join(repr(requirement) for requirement in self.requirements) + ")"
+
+
+class NotRequirement(Requirement):
+    __slots__ = ("requirement",)
+
+    def __init__(self, requirement: Requirement):
+        self.requirement = requirement
+
+    def __call__(self, state: CollectionState) -> bool:
+        return not self.requirement(state)
+
+    def get_key(self) -> Optional[tuple]:
+        return ("not", self.requirement)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return self.requirement.get_item_names()
+
+    def get_cost(self) -> int:
+        return self.requirement.get_cost()
+
+    def __repr__(self) -> str:
+        return f"!{self.requirement!r}"
+
+
+def combine_item_names(requirements) -> Optional[frozenset[str]]:
+    item_names = frozenset()
+    for requirement in requirements:
+        names = requirement.get_item_names()
+        if names is None:
+            return None
+        item_names |= names
+    return item_names
+
+
+def all_of(first: Requirement, second: Requirement) -> Requirement:
+    if first is NEVER or second is NEVER:
+        return NEVER
+    if first is ALWAYS:
+        return second
+    if second is ALWAYS:
+        return first
+
+    requirements = []
+    for requirement in (first, second):
+        if isinstance(requirement, AllRequirement):
+            requirements.extend(requirement.requirements)
+        else:
+            requirements.append(requirement)
+    return AllRequirement(tuple(requirements))
+
+def any_of(first: Requirement, second: Requirement) -> Requirement:
+    if first is ALWAYS or second is ALWAYS:
+        return ALWAYS
+    if first is NEVER:
+        return second
+    if second is NEVER:
+        return first
+
+    requirements = []
+    for requirement in (first, second):
+        if isinstance(requirement, AnyRequirement):
+            requirements.extend(requirement.requirements)
+        else:
+            requirements.append(requirement)
+    return AnyRequirement(tuple(requirements))
+
+def none_of(requirement: Requirement) -> Requirement:
+    if requirement is ALWAYS:
+        return NEVER
+    if requirement is NEVER:
+        return ALWAYS
+    if isinstance(requirement, NotRequirement):
+        return requirement.requirement
+    return NotRequirement(requirement)
+
+
+class StringEvaluatorRequirement(Requirement):
+    """Hands a requires string to the string evaluator on every call, like before they were compiled.
+    Used for whatever the compiler can't reproduce exactly, which is mostly invalid requires, so they raise the same errors."""
+    __slots__ = ("compiler", "requires", "area")
+
+    def __init__(self, compiler: "RuleCompiler", requires: str, area: dict):
+        self.compiler = compiler
+        self.requires = requires
+        self.area = area
+
+    def __call__(self, state: CollectionState) -> bool:
+        return self.compiler.evaluate_requires_string(state, self.requires, self.area)
+
+
+class FunctionsRequirement(Requirement):
+    """A requires with {functions} in it. The functions still run on every call, but the text they leave
+    (like "1 AND |Item:2|") is only compiled the first time it shows up."""
+    __slots__ = ("compiler", "requires", "area", "compiled")
+
+    def __init__(self, compiler: "RuleCompiler", requires: str, area: dict):
+        self.compiler = compiler
+        self.requires = requires
+        self.area = area
+        self.compiled: dict[str, Requirement] = {}
+
+    def __call__(self, state: CollectionState) -> bool:
+        requires = self.compiler.run_functions(state, self.requires, self.area)
+        requirement = self.compiled.get(requires)
+        if requirement is None:
+            requirement = self.compiler.compile_text(requires, self.area)
+            if len(self.compiled) < MAX_COMPILED_FUNCTION_RESULTS:
+                self.compiled[requires] = requirement
+        return requirement(state)
+
+
+class NotABoolResult(Exception):
+    """Raised by a FunctionRequirement whose function didn't return a bool after all"""
+
+
+class FunctionRequirement(Requirement):
+    """One {function} of a requires, as an operand of its own like an |item|, so it's only called when the rest of the requires doesn't already decide it.
+    Only used for the functions that say they return a bool (def Function(...) -> bool), since what any other function returns
+    gets put in the requires as text, which can change how the rest of it reads."""
+    __slots__ = ("compiler", "func_name", "func_args", "area")
+
+    def __init__(self, compiler: "RuleCompiler", func_name: str, func_args: str, area: dict):
+        self.compiler = compiler
+        self.func_name = func_name
+        self.func_args = func_args
+        self.area = area
+
+    def __call__(self, state: CollectionState) -> bool:
+        result = self.compiler.call_function(state, self.func_name, self.func_args, self.area)
+        if not isinstance(result, bool):
+            raise NotABoolResult(result)
+        return result
+
+    def get_key(self) -> Optional[tuple]:
+        # the errors it raises name the location or region
+        return ("function", self.func_name, self.func_args, id(self.area))
+
+    def __repr__(self) -> str:
+        return f"{{{self.func_name}({self.func_args})}}"
+
+
+class FunctionTreeRequirement(Requirement):
+    """A requires with {functions} in it, compiled into a tree with a FunctionRequirement for each function.
+    If one of them doesn't return a bool, the whole requires is checked the old way by the FunctionsRequirement instead."""
+    __slots__ = ("tree", "functions")
+
+    def __init__(self, tree: Requirement, functions: FunctionsRequirement):
+        self.tree = tree
+        self.functions = functions
+
+    def __call__(self, state: CollectionState) -> bool:
+        try:
+            return self.tree(state)
+        except NotABoolResult:
+            return self.functions(state)
+
+    def get_key(self) -> Optional[tuple]:
+        return ("function tree", self.tree)
+
+    def get_cost(self) -> int:
+        return self.tree.get_cost()
+
+    def __repr__(self) -> str:
+        return repr(self.tree)
+
+
+class CachedRequirement(Requirement):
+    """Remembers the result of a requirement in each CollectionState, until the player's items in it change.\n
+    Only used for requirements that read nothing but the player's items (see only_reads_items), since their result can't change otherwise"""
+    __slots__ = ("requirement", "player")
+
+    def __init__(self, requirement: Requirement, player: int):
+        self.requirement = requirement
+        self.player = player
+
+    def __call__(self, state: CollectionState) -> bool:
+        results = state.manual_rule_results[self.player]
+        result = results.get(self)
+        if result is None:
+            result = results[self] = self.requirement(state)
+        return result
+
+    def get_key(self) -> Optional[tuple]:
+        return ("cached", self.requirement)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        return self.requirement.get_item_names()
+
+    def get_cost(self) -> int:
+        return self.requirement.get_cost()
+
+    def __repr__(self) -> str:
+        return repr(self.requirement)
+
+
+class DictRequirement(Requirement):
+    """A requires in the dict/list form that RuleCompiler.compile_dict can't compile, so its error is raised when it's checked"""
+    __slots__ = ("compiler", "requires")
+
+    def __init__(self, compiler: "RuleCompiler", requires: list):
+        self.compiler = compiler
+        self.requires = requires
+
+    def __call__(self, state: CollectionState) -> bool:
+        return self.compiler.check_require_dict(state, self.requires)
+
+    def get_cost(self) -> int:
+        return len(self.requires)
+
+    def get_item_names(self) -> Optional[frozenset[str]]:
+        item_names = set()
+        for item in self.requires:
+            or_items = item["or"] if isinstance(item, dict) and isinstance(item.get("or"), list) else item if isinstance(item, list) else [item]
+            for or_item in or_items:
+                if not isinstance(or_item, str):
+                    return None
+                item_names.add(or_item.split(":")[0])
+        return frozenset(item_names)
+
+
+def only_reads_items(requirement: Requirement) -> bool:
+    """Whether the requirement only depends on the player's items in the state, and not on anything like what's reachable"""
+    if isinstance(requirement, (AllRequirement, AnyRequirement)):
+        return all(only_reads_items(part) for part in requirement.requirements)
+    if isinstance(requirement, NotRequirement):
+        return only_reads_items(requirement.requirement)
+    return isinstance(requirement, (ConstantRequirement, ItemRequirement, CategoryRequirement, ItemKeywordRequirement,
+                                    CategoryKeywordRequirement, DictRequirement, CachedRequirement))
+
+
+class ManualRuleResults(LogicMixin):
+    # Only the mixin functions are defined here: anything else would be set on CollectionState itself,
+    # where it would clash with the same name from any other manual world that's loaded
+    def init_mixin(self, multiworld: MultiWorld):
+        self.manual_rule_results = defaultdict(dict) # player -> {CachedRequirement: result}
+
+    def copy_mixin(self, new_state: CollectionState) -> CollectionState:
+        # The copy gets a cache of its own, since it's going to collect different items from here
+        new_state.manual_rule_results = defaultdict(dict)
+        return new_state
+
+
+def invalidate_rule_results(state: CollectionState, player: int):
+    """Forget the rule results cached in this state for the player. ManualWorld.collect and remove call this whenever the player's items change,
+    anything else that changes state.prog_items for the player has to as well"""
+    state.manual_rule_results[player] = {}
+
+
+class RuleDependencies:
+    """Which of the player's locations and entrances have a rule that reads each item, built by set_rules and kept in world.rule_dependencies.\n
+    After some items are collected or removed, get_affected() gives the only rules whose answer can have changed,
+    so a sweep or a tracker can check those again instead of every location that isn't reached yet.
+    Rules that call requirement functions (or that the compiler couldn't handle) can depend on anything, so they're always in there.\n
+    This only covers the rules themselves: a location can also become reachable because its region just did,
+    and rules changed after set_rules (like in the after_set_rules hook) aren't tracked."""
+
+    def __init__(self):
+        self.item_names: dict[Location | Entrance, Optional[frozenset[str]]] = {}
+        self.by_item: Optional[dict[str, list[Location | Entrance]]] = None
+        self.always: list[Location | Entrance] = []
+
+    def add(self, spot: Location | Entrance, requirement: Requirement):
+        """Record that requirement is (part of) the rule of spot"""
+        item_names = requirement.get_item_names()
+        if spot in self.item_names:
+            # An entrance gets one rule per add_rule, and needs all of them
+            previous = self.item_names[spot]
+            item_names = None if previous is None or item_names is None else previous | item_names
+        self.item_names[spot] = item_names
+        self.by_item = None
+
+    def get_item_names(self, spot: Location | Entrance) -> Optional[frozenset[str]]:
+        """The items the rule of spot reads, or None if it can depend on anything"""
+        return self.item_names.get(spot, frozenset())
+
+    def build_index(self):
+        self.by_item = {}
+        self.always = []
+        for spot, item_names in self.item_names.items():
+            if item_names is None:
+                self.always.append(spot)
+                continue
+            for item_name in item_names:
+                self.by_item.setdefault(item_name, []).append(spot)
+
+    def get_affected(self, items) -> list[Location | Entrance]:
+        """The locations and entrances whose rule can give a different answer now that these items (Items or item names) changed"""
+        if self.by_item is None:
+            self.build_index()
+
+        affected = dict.fromkeys(self.always)
+        for item in items:
+            affected.update(dict.fromkeys(self.by_item.get(getattr(item, "name", item), ())))
+        return list(affected)
+
+    def get_affected_locations(self, items) -> list[Location]:
+        return [spot for spot in self.get_affected(items) if isinstance(spot, Location)]
+
+
+class CountKeywords:
+    """Every requirement of a player with a count that's worked out from the item pool (|Item:all|, |@Category:half|, |Item:50%|...),
+    so the counts can be worked out again if the item counts change after the rules are compiled, like in a hook.
+    ManualWorld.resolve_count_keywords() calls resolve() after each of the hooks that could do that.
+    It keeps a copy of the counts it last worked them out from, so the counts being edited in place is noticed as well as replaced.\n
+    Rule results that states already cached (see CachedRequirement) aren't forgotten then, so this is for changes made before fill."""
+
+    def __init__(self, world: "ManualWorld"):
+        self.world = world
+        self.requirements: list[ItemKeywordRequirement | CategoryKeywordRequirement] = []
+        self.items_counts = Counter(world.get_item_counts(only_progression=True))
+        self.version = 0 # goes up every time the counts are worked out again
+
+    def add(self, requirement: ItemKeywordRequirement | CategoryKeywordRequirement):
+        self.requirements.append(requirement)
+
+    def resolve(self):
+        items_counts = self.world.get_item_counts(only_progression=True)
+        if items_counts == self.items_counts:
+            return
+
+        self.items_counts = Counter(items_counts)
+        for requirement in self.requirements:
+            requirement.resolve(items_counts)
+        self.version += 1
+
+
+class RuleCompiler:
+    """Compiles the requires of one player's locations and regions into Requirements.\n
+    Every requirement it compiles is interned: locations and regions with the same requirement (like the 40 player slot
+    locations of a generated linklink region, or every region that needs |Sword:3|) all share one Requirement object.\n
+    The compiled rules can be checked from several threads at once, each with its own CollectionState:
+    all they keep is immutable (records, RuleContexts, the Requirements themselves), and the caches filled while they're checked
+    (compiled_texts, binding_plans, FunctionsRequirement.compiled) are only ever added to, with an entry that's the same whoever makes it.
+    The only other thing written is the rule results cache of the state being checked (see CachedRequirement)."""
+
+    def __init__(self, world: "ManualWorld", multiworld: MultiWorld, player: int):
+        self.world = world
+        self.multiworld = multiworld
+        self.player = player
+        self.interned: dict[tuple, Requirement] = {} # get_key() -> the shared requirement, in the order they were first compiled
+        self.interned_order: dict[Requirement, int] = {ALWAYS: 0, NEVER: 1}
+        self.compiled_texts: dict[str, Requirement] = {}
+        self.folded_texts: dict[str, str] = {}
+        self.count_keywords = CountKeywords(world)
+        self.binding_plans: dict[tuple[str, str], tuple[tuple, tuple[int, ...]]] = {}
+
+    def compile_area(self, area: dict) -> Requirement:
+        # if it's not a usable object of some sort, default to true
+        if not area:
+            return ALWAYS
+
+        # The rules only keep the records (or a RuleContext made from a plain dict), which can't change while they're checked
+        if not isinstance(area, ManualRecord):
+            area = RuleContext.from_area(area)
+
+        # don't require the "requires" key for locations and regions if they don't need to use it
+        if "requires" not in area:
+            return ALWAYS
+
+        if isinstance(area["requires"], str):
+            return self.compile_requires(area["requires"], area)
+        elif isinstance(area["requires"], (list, dict)) and not area["requires"]: # like the "requires": [] of the Manual region
+            return ALWAYS
+        else:  # item access is in dict form
+            requirement = self.compile_dict(area["requires"])
+            if requirement is None:
+                return DictRequirement(self, area["requires"])
+            return requirement
+
+    def compile_requires(self, requires: str, area: dict) -> Requirement:
+        if requires == "":
+            return ALWAYS
+
+        if REQUIRES_FUNCTION.search(requires):
+            requires = self.fold_functions(requires)
+
+            # What the rest of the functions return can change with the state, so they get run on each call and what they leave is compiled then,
+            # unless they all return a bool: then they're compiled into the tree with the items, and only called when needed
+            if REQUIRES_FUNCTION.search(requires):
+                functions = FunctionsRequirement(self, requires, area)
+                tree = self.parse_functions(requires, area)
+                if tree is None:
+                    return functions
+                return self.intern(FunctionTreeRequirement(tree, functions))
+
+        return self.compile_text(requires, area)
+
+    def fold_functions(self, requires: str) -> str:
+        """Run the {functions} of a requires that don't depend on the CollectionState (like YamlEnabled or OptAll)
+        and put their result in it, the way run_functions would. The ones that do depend on it are left in.\n
+        Functions are run a round at a time like run_functions does, until a round has one that depends on the state.
+        If anything goes wrong the requires is left as it is, so the error is raised when the rule gets checked, like before."""
+        if requires in self.folded_texts:
+            return self.folded_texts[requires]
+
+        folded = requires
+        try:
+            for _ in range(self.world.rules_functions_maximum_recursion + 1):
+                found_functions = REQUIRES_FUNCTION.findall(folded)
+                if not found_functions:
+                    break
+
+                # A function call inside another's arguments gets matched oddly by the regex, so those are left to run_functions
+                if any('{' in func_args or '}' in func_args for _, func_args in found_functions):
+                    folded = requires
+                    break
+
+                state_dependent = False
+                for func_name, func_args in found_functions:
+                    func = get_requirement_function(func_name)
+                    if not callable(func):
+                        raise ValueError(f'Invalid function "{func_name}"')
+
+                    if is_state_dependent(func_name, func):
+                        state_dependent = True
+                    else:
+                        folded = replace_function_call(folded, func_name, func_args, self.call_function(None, func_name, func_args, {}))
+
+                if state_dependent:
+                    break
+            else:
+                if REQUIRES_FUNCTION.search(folded):
+                    folded = requires # Looped more than the maximum recursion
+        except Exception:
+            folded = requires
+
+        self.folded_texts[requires] = folded
+        return folded
+
+    def compile_text(self, requires: str, area: dict) -> Requirement:
+        """Compile a requires without any functions left in it, the way the string evaluator would read it"""
+        requirement = self.compiled_texts.get(requires)
+        if requirement is None:
+            requirement = self.parse_text(requires)
+            if requirement is None:
+                # the errors it raises name the location or region, so this one can't be shared
+                return StringEvaluatorRequirement(self, requires, area)
+            requirement = self.compiled_texts[requires] = self.intern(requirement)
+        return requirement
+
+    def cache(self, requirement: Requirement) -> Requirement:
+        """Wrap the requirement in a CachedRequirement if it's worth it: one that only reads the player's items,
+        and isn't already as quick to check as looking up its result would be"""
+        if isinstance(requirement, (ConstantRequirement, ItemRequirement, CachedRequirement)) or not only_reads_items(requirement):
+            return requirement
+        return self.intern(CachedRequirement(requirement, self.player))
+
+    def intern(self, requirement: Requirement) -> Requirement:
+        """Return the shared copy of this requirement, so each distinct requirement is only one object.\n
+        The parts of an AND or OR are put in a set order (and duplicates dropped), so "|A| AND |B|" is the same requirement as "|B| AND |A|"."""
+        if requirement is ALWAYS or requirement is NEVER:
+            return requirement
+
+        if isinstance(requirement, (AllRequirement, AnyRequirement)):
+            requirements = {}
+            for part in requirement.requirements:
+                part = self.intern(part)
+                # a part can come back as the same kind of requirement once its own duplicates are dropped
+                for subpart in part.requirements if type(part) is type(requirement) else (part,):
+                    requirements[subpart] = None
+
+            if len(requirements) == 1:
+                return next(iter(requirements))
+            requirement = type(requirement)(tuple(sorted(requirements, key=self.get_order)))
+        elif isinstance(requirement, NotRequirement):
+            requirement = NotRequirement(self.intern(requirement.requirement))
+
+        key = requirement.get_key()
+        if key is None:
+            return requirement
+
+        if key not in self.interned:
+            self.interned[key] = requirement
+            self.interned_order[requirement] = len(self.interned_order)
+            if isinstance(requirement, (ItemKeywordRequirement, CategoryKeywordRequirement)):
+                self.count_keywords.add(requirement)
+        return self.interned[key]
+
+    def get_order(self, requirement: Requirement) -> tuple:
+        """Where a part goes in an AND or OR: the ones that can't be shared (like requires left to the string evaluator) first,
+        so their errors still get raised, then the cheapest ones, so the rest often don't need checking at all"""
+        order = self.interned_order.get(requirement)
+        if order is None:
+            return (0, 0, 0)
+        return (1, requirement.get_cost(), order)
+
+    def parse_functions(self, requires: str, area: dict) -> Optional[Requirement]:
+        """Compile a requires that still has {functions} in it, with each function as a FunctionRequirement operand.
+        Returns None unless every function says it returns a bool, and is a whole operand (not inside an |item| or another function)."""
+        if REQUIRES_PLACEHOLDER.search(requires):
+            return None
+
+        functions: list[Requirement] = []
+        for func_name, func_args in REQUIRES_FUNCTION.findall(requires):
+            call = "{" + func_name + "(" + func_args + ")}"
+            if call not in requires:
+                continue # the same call came up earlier, and every copy of it was replaced then
+
+            func = get_requirement_function(func_name)
+            if not callable(func) or '{' in func_args or '}' in func_args or len(functions) == PLACEHOLDER_COUNT:
+                return None
+            try:
+                if inspect.signature(func).return_annotation is not bool:
+                    return None
+            except (TypeError, ValueError):
+                return None
+
+            # the functions are run before anything else in the requires is read, so they take the place of the 1 or 0 they'd leave
+            requires = requires.replace(call, chr(PLACEHOLDER_START + len(functions)))
+            functions.append(self.intern(FunctionRequirement(self, func_name, func_args, area)))
 
-        if requires_list == "":
-            return True
+        if '{' in requires or '}' in requires:
+            return None
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
+        requirement = self.parse_operands(requires, functions)
+        return self.intern(requirement) if requirement is not None else None
+
+    def parse_text(self, requires: str) -> Optional[Requirement]:
+        """Follow the same steps as evaluate_requires_string, but with a placeholder where it would put the 1 or 0 of an |item|,
+        then build the tree from the postfix infix_to_postfix would make. Returns None if it can't be done exactly."""
+        if REQUIRES_PLACEHOLDER.search(requires):
+            return None
+
+        return self.parse_operands(requires, [])
+
+    def parse_operands(self, requires: str, operands: list[Requirement]) -> Optional[Requirement]:
+        """parse_text, for a requires that can already have placeholders for some operands in it"""
+        operands = list(operands)
+        for item in REQUIRES_TOKEN.findall(requires):
+            if REQUIRES_PLACEHOLDER.search(item):
+                return None # a {function} inside an |item|
+
+            requirement = self.compile_item(item)
+            if requirement is None or len(operands) == PLACEHOLDER_COUNT:
+                return None
+
+            if ('0' in item or '1' in item) and ENCLOSED_PLACEHOLDER.search(requires):
+                return None
+
+            requires = requires.replace(item, chr(PLACEHOLDER_START + len(operands)))
+            operands.append(requirement)
+
+        requires = REQUIRES_AND.sub('&', requires)
+        requires = REQUIRES_OR.sub('|', requires)
+
+        prec = {"&": 2, "|": 2, "!": 3}
+        stack = []
+        postfix = []
+        for c in requires:
+            if c == "0":
+                postfix.append(NEVER)
+            elif c == "1":
+                postfix.append(ALWAYS)
+            elif c.isnumeric():
+                continue # evaluate_postfix skips any other number
+            elif PLACEHOLDER_START <= ord(c) < PLACEHOLDER_START + PLACEHOLDER_COUNT:
+                postfix.append(operands[ord(c) - PLACEHOLDER_START])
+            elif c in prec:
+                while stack and stack[-1] != "(" and prec[c] <= prec[stack[-1]]:
+                    postfix.append(stack.pop())
+                stack.append(c)
+            elif c == "(":
+                stack.append(c)
+            elif c == ")":
+                while stack and stack[-1] != "(":
+                    postfix.append(stack.pop())
+                if not stack:
+                    return None
+                stack.pop()
+
+        while stack:
+            c = stack.pop()
+            if c != "(": # a ( that's never closed ends up in the postfix, where evaluate_postfix skips it
+                postfix.append(c)
+
+        result: list[Requirement] = []
+        for c in postfix:
+            if c == "!":
+                if not result:
+                    return None
+                result.append(none_of(result.pop()))
+            elif c == "&" or c == "|":
+                if len(result) < 2:
+                    return None
+                op2 = result.pop()
+                op1 = result.pop()
+                result.append(all_of(op1, op2) if c == "&" else any_of(op1, op2))
+            else:
+                result.append(c)
+
+        if len(result) != 1:
+            return None
+
+        return result[0]
+
+    def compile_dict(self, requires) -> Optional[Requirement]:
+        """Compile a requires in the dict/list form the way check_require_dict reads it: it's met as soon as one of its "or" groups (or lists)
+        has every item in it, or else if every item listed on its own is there. None if any entry would make check_require_dict fail."""
+        items_requirement = ALWAYS
+        groups_requirement = NEVER
+        for item in requires:
+            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+                group_requirement = ALWAYS
+                for or_item in item["or"] if isinstance(item, dict) else item:
+                    requirement = self.compile_dict_item(or_item)
+                    if requirement is None:
+                        return None
+                    group_requirement = all_of(group_requirement, requirement)
+                groups_requirement = any_of(groups_requirement, group_requirement)
+            else:
+                requirement = self.compile_dict_item(item)
+                if requirement is None:
+                    return None
+                items_requirement = all_of(items_requirement, requirement)
+
+        return self.intern(any_of(groups_requirement, items_requirement))
+
+    def compile_dict_item(self, item: str) -> Optional[Requirement]:
+        """One "Item" or "Item:N" of a dict/list requires"""
+        if not isinstance(item, str):
+            return None
+
+        item_parts = item.split(":")
+        item_name = item
+        item_count = 1
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0]
+            try:
+                item_count = int(item_parts[1])
+            except ValueError:
+                return None
+
+        if item_count <= 0:
+            return ALWAYS
+        return ItemRequirement(item_name, self.player, item_count)
+
+    def compile_item(self, item: str) -> Optional[Requirement]:
+        """Compile one |item| or |@category| of a requires, or None for one the string evaluator would fail on (or read oddly)"""
+        require_type = 'item'
+
+        if '|@' in item:
+            require_type = 'category'
+
+        item = item.lstrip('|@$').rstrip('|')
+
+        item_parts = item.split(":")
+        item_name = item
+        item_count = "1"
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip()
+
+        if is_count_keyword(item_count):
+            try:
+                resolve_count_keyword(item_count, 0)
+            except ValueError:
+                return None
+        else:
+            try:
+                item_count = int(item_count)
+            except ValueError:
+                return None
+
+        if require_type == 'category':
+            category_index = self.world.get_category_index()
+            category_items = category_index.get_item_names(item_name)
+            if isinstance(item_count, str):
+                if not category_items:
+                    return NEVER
+                return CategoryKeywordRequirement(self.world, category_index, item_name, self.player, item_count)
+            if not category_items:
+                # the string evaluator leaves these as is when the count is negative, and reads whatever numbers are in them
+                return NEVER if item_count >= 0 else None
+            if item_count <= 0:
+                return ALWAYS
+            return CategoryRequirement(item_name, category_items, self.player, item_count, category_index.get_counter_key(item_name))
+        else:
+            if isinstance(item_count, str):
+                return ItemKeywordRequirement(self.world, item_name, self.player, item_count)
+            if item_count <= 0:
+                return ALWAYS
+            return ItemRequirement(item_name, self.player, item_count)
+
+    def get_area_description(self, area: dict) -> tuple[str, str]:
+        # Preparing some variables for exception messages
+        area_type = "region" if area.get("is_region",False) else "location"
+        area_name = area["name"] if "name" in area else f"unknown with these parameters: {dict(area)}"
+        return area_type, area_name
+
+    # The original string evaluator, split in two. The {functions} and the requires the compiler can't reproduce exactly still go through it
+    def run_functions(self, state: CollectionState, requires_list: str, area: dict, recursionDepth: int = 0) -> str:
+        found_functions = REQUIRES_FUNCTION.findall(requires_list)
+        if found_functions:
+            area_type, area_name = self.get_area_description(area)
+            if recursionDepth > self.world.rules_functions_maximum_recursion:
+                raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {self.world.rules_functions_maximum_recursion}) \
                                          \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
                                          \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
+            else:
+                for func_name, func_args in found_functions:
+                    result = self.call_function(state, func_name, func_args, area)
+                    requires_list = replace_function_call(requires_list, func_name, func_args, result)
+
+            requires_list = self.run_functions(state, requires_list, area, recursionDepth + 1)
+        return requires_list
+
+    def call_function(self, state: Optional[CollectionState], func_name: str, func_args_text: str, area: dict):
+        func = get_requirement_function(func_name)
+
+        if not callable(func):
+            area_type, area_name = self.get_area_description(area)
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        func_args, state_positions = self.get_binding_plan(func_name, func, func_args_text, area)
+        if state_positions:
+            func_args = list(func_args)
+            for index in state_positions:
+                func_args[index] = state
+
+        try:
+            return func(*func_args)
+        except Exception as ex:
+            area_type, area_name = self.get_area_description(area)
+            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                                                \nUnless it was called by another function, it should look something like "{{{func_name}({func_args_text})}}" in {area_type}s.json. \
                                                 \nFull error message: \
                                                 \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
 
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
+    def evaluate_requires_string(self, state: CollectionState, requires_list: str, area: dict) -> bool:
+        # Get the "real" item counts of item in the pool/placed/starting_items
+        items_counts = self.world.get_item_counts(self.player, only_progression=True)
 
         # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
+        for item in REQUIRES_TOKEN.findall(requires_list):
             require_type = 'item'
 
             if '|@' in item:
@@ -178,8 +1162,9 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             total = 0
 
             if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+                category_index = self.world.get_category_index()
+                category_items = category_index.get_item_names(item_name)
+                category_items_counts = category_index.get_pool_count(item_name, items_counts)
                 if item_count.lower() == 'all':
                     item_count = category_items_counts
                 elif item_count.lower() == 'half':
@@ -194,7 +1179,7 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                         raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
 
                 for category_item in category_items:
-                    total += state.count(category_item["name"], player)
+                    total += state.count(category_item, self.player)
 
                     if total >= item_count:
                         requires_list = requires_list.replace(item_base, "1")
@@ -210,7 +1195,7 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                 else:
                     item_count = int(item_count)
 
-                total = state.count(item_name, player)
+                total = state.count(item_name, self.player)
 
                 if total >= item_count:
                     requires_list = requires_list.replace(item_base, "1")
@@ -218,17 +1203,16 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             if total <= item_count:
                 requires_list = requires_list.replace(item_base, "0")
 
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
+        requires_list = REQUIRES_AND.sub('&', requires_list)
+        requires_list = REQUIRES_OR.sub('|', requires_list)
 
         requires_string = infix_to_postfix("".join(requires_list), area)
         return (evaluate_postfix(requires_string, area))
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
+    def check_require_dict(self, state: CollectionState, requires: list) -> bool:
         canAccess = True
 
-        for item in area["requires"]:
+        for item in requires:
             # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
             if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
                 canAccessOr = True
@@ -246,7 +1230,7 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                         or_item_name = or_item_parts[0]
                         or_item_count = int(or_item_parts[1])
 
-                    if not state.has(or_item_name, player, or_item_count):
+                    if not state.has(or_item_name, self.player, or_item_count):
                         canAccessOr = False
 
                 if canAccessOr:
@@ -261,87 +1245,32 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                     item_name = item_parts[0]
                     item_count = int(item_parts[1])
 
-                if not state.has(item_name, player, item_count):
+                if not state.has(item_name, self.player, item_count):
                     canAccess = False
 
         return canAccess
 
-    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
-        # if it's not a usable object of some sort, default to true
-        if not area:
-            return True
-
-        # don't require the "requires" key for locations and regions if they don't need to use it
-        if "requires" not in area.keys():
-            return True
-
-        if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
-        else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
-
-    used_location_names = []
-    # Region access rules
-    for region in regionMap.keys():
-        used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
-        if region != "Menu":
-            for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
-
-                    return fullLocationOrRegionCheck(state, region)
-
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
-            entrance_rules = regionMap[region].get("entrance_requires", {})
-            for e in entrance_rules:
-                entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
-            exit_rules = regionMap[region].get("exit_requires", {})
-            for e in exit_rules:
-                exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
-
-    # Location access rules
-    for location in world.location_table:
-        if location["name"] not in used_location_names:
-            continue
-
-        locFromWorld = multiworld.get_location(location["name"], player)
-
-        locationRegion = regionMap[location["region"]] if "region" in location else None
-
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
-
-        if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
-                regionCheck = True # default to true unless there's a region with requires
-
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
-
-                return locationCheck and regionCheck
-
-            set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
-
-            set_rule(locFromWorld, fullRegionCheck)
-        else: # No location region and no location requires? It's accessible.
-            def allRegionsAccessible(state):
-                return True
-
-            set_rule(locFromWorld, allRegionsAccessible)
-
-    # Victory requirement
-    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
-
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
+    def get_binding_plan(self, func_name: str, func, func_args_text: str, area: dict) -> tuple[tuple, tuple[int, ...]]:
+        """How to call a requirement function with the arguments it has in a requires: (the arguments, the positions the CollectionState goes in).\n
+        The world, multiworld and player are already in place and the other arguments already converted to the types the function asks for,
+        so once it's been worked out for a function and its arguments, every call is a plain positional call."""
+        plan = self.binding_plans.get((func_name, func_args_text))
+        if plan is None:
+            func_args = func_args_text.split(",")
+            if func_args == ['']:
+                func_args.pop()
+
+            immutable = self.convert_req_function_args(func, func_args, self.get_area_description(area)[1])
+            plan = (tuple(func_args), tuple(index for index, arg in enumerate(func_args) if arg is STATE_ARGUMENT))
+            # An argument converted to something like a list or dict could get changed by the function, so those get converted again each call
+            if immutable:
+                self.binding_plans[(func_name, func_args_text)] = plan
+        return plan
+
+    def convert_req_function_args(self, func, args: list[str], areaName: str) -> bool:
+        """Put the world, multiworld, player and STATE_ARGUMENT (where the CollectionState goes) in args, and convert the other args to the types func asks for.
+        Returns whether everything converted is immutable."""
+        immutable = True
         parameters = inspect.signature(func).parameters
         knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
         index = -1
@@ -350,14 +1279,14 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             index += 1
             if target_type in knownParameters:
                 if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
+                    args.insert(index, self.world)
                 elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
+                    args.insert(index, self.multiworld)
                 elif target_type == CollectionState:
-                    args.insert(index, state)
+                    args.insert(index, STATE_ARGUMENT)
                 continue
             if parameter.name.lower() == "player":
-                args.insert(index, player)
+                args.insert(index, self.player)
                 continue
 
             if index < len(args) and args[index] != "":
@@ -386,9 +1315,78 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                 raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
 
             args[index] = value
+            if not isinstance(value, (str, int, float, bool, type(None), tuple, frozenset)):
+                immutable = False
+
+        return immutable
+
+
+def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    # Every requires is compiled once here, so the rules don't have to parse them again each time they're checked
+    compiler = RuleCompiler(world, multiworld, player)
+    world.count_keywords = compiler.count_keywords
+    # The rules that only read the player's items remember their result in each state until those change (see CachedRequirement)
+    region_rules = {region: compiler.cache(compiler.compile_area(regionMap[region])) for region in regionMap}
+
+    # Requires that are always met (empty ones, like every generated linklink location has) don't get a rule at all:
+    # entrances keep the rule they already have, and locations get Archipelago's default one, which add_rule replaces instead of wrapping
+    def addEntranceRule(entrance: Entrance, rule: Requirement, profile_name: str):
+        if rule is not ALWAYS:
+            add_rule(entrance, profiler.wrap(profile_name, rule) if profiler is not None else rule)
+            dependencies.add(entrance, rule)
+
+    dependencies = world.rule_dependencies = RuleDependencies()
+    # With MANUAL_PROFILE_RULES set, every rule gets installed inside a ProfiledRule that times it
+    profiler = world.rule_profiler = RuleProfiler(world) if PROFILING_ENABLED else None
+    used_location_names = set()
+    # Region access rules
+    for region in regionMap.keys():
+        used_location_names.update(l.name for l in multiworld.get_region(region, player).locations)
+        if region != "Menu":
+            for exitRegion in multiworld.get_region(region, player).entrances:
+                addEntranceRule(world.get_entrance(exitRegion.name), region_rules[region], f"Region '{region}'")
+            entrance_rules = regionMap[region].get("entrance_requires", {})
+            for e in entrance_rules:
+                entrance = world.get_entrance(f'{e}To{region}')
+                addEntranceRule(entrance, compiler.cache(compiler.compile_area({"requires": entrance_rules[e]})), f"Entrance '{entrance.name}' (entrance_requires)")
+            exit_rules = regionMap[region].get("exit_requires", {})
+            for e in exit_rules:
+                exit = world.get_entrance(f'{region}To{e}')
+                addEntranceRule(exit, compiler.cache(compiler.compile_area({"requires": exit_rules[e]})), f"Entrance '{exit.name}' (exit_requires)")
+
+    # Location access rules
+    for location in world.location_table:
+        if location["name"] not in used_location_names:
+            continue
+
+        locFromWorld = multiworld.get_location(location["name"], player)
+
+        locationRegion = regionMap[location["region"]] if "region" in location else None
+
+        if "requires" in location: # Location has requires, check them alongside the region requires
+            locationCheck = compiler.compile_area(location)
+            regionCheck = ALWAYS # default to true unless there's a region with requires
+
+            if locationRegion:
+                regionCheck = region_rules[location["region"]]
+
+            rule = compiler.cache(compiler.intern(all_of(locationCheck, regionCheck)))
+        elif "region" in location: # Only region access required, check the location's region's requires
+            rule = region_rules[location["region"]]
+        else: # No location region and no location requires? It's accessible.
+            rule = ALWAYS
+
+        if rule is ALWAYS:
+            set_rule(locFromWorld, Location.access_rule)
+        else:
+            set_rule(locFromWorld, profiler.wrap(f"Location '{locFromWorld.name}'", rule) if profiler is not None else rule)
+        dependencies.add(locFromWorld, rule)
+
+    # Victory requirement
+    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
 
 
-def ItemValue(state: CollectionState, player: int, valueCount: str):
+def ItemValue(state: CollectionState, player: int, valueCount: str) -> bool:
     """When passed a string with this format: 'valueName:int',
     this function will check if the player has collect at least 'int' valueName worth of items\n
     eg. {ItemValue(Coins:12)} will check if the player has collect at least 12 coins worth of items
@@ -431,8 +1429,7 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
     if require_type == 'category':
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_items_counts = world.get_category_index().get_pool_count(item_name, items_counts)
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
     elif require_type == 'item':
@@ -469,7 +1466,7 @@ def OptAll(world: "ManualWorld", requires: str):
     return requires_list
 
 # Rule to expose the can_reach_location core function
-def canReachLocation(state: CollectionState, player: int, location: str):
+def canReachLocation(state: CollectionState, player: int, location: str) -> bool:
     """Can the player reach the given location?"""
     if state.can_reach_location(location, player):
         return True
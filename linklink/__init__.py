@@ -12,15 +12,18 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 from .Data import item_table, location_table, region_table, category_table
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld, enable_region_diagram
-from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
+from .Locations import location_id_to_name, get_location_name_to_id, location_name_to_location, location_name_groups, victory_names
 from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
-from .Rules import set_rules
+from .Rules import set_rules, invalidate_rule_results, RuleDependencies, CountKeywords
+from .BatchRules import LocationRuleBatch
+from .RuleProfiler import RuleProfiler
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat, \
+    CategoryIndex, CategoryCounters
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -60,10 +63,16 @@ class ManualWorld(World):
 
     item_counts: dict[int, Counter[str]] = {}
     item_counts_progression: dict[int, Counter[str]] = {}
+    category_index: Optional[CategoryIndex] = None
+    category_counters: Optional[CategoryCounters] = None # Made the first time it's needed, see get_category_counters
+    rule_dependencies: Optional[RuleDependencies] = None # Built by set_rules, see Rules.RuleDependencies
+    count_keywords: Optional[CountKeywords] = None # Made by set_rules, see resolve_count_keywords
+    location_rule_batch: Optional[LocationRuleBatch] = None # Made by evaluate_location_rules the first time it's used
+    rule_profiler: Optional[RuleProfiler] = None # Only made by set_rules when MANUAL_PROFILE_RULES is set
     start_inventory = {}
 
     location_id_to_name = location_id_to_name
-    location_name_to_id = location_name_to_id
+    location_name_to_id = get_location_name_to_id()
     location_name_to_location = location_name_to_location
     location_name_groups = location_name_groups
     victory_names = victory_names
@@ -243,6 +252,7 @@ class ManualWorld(World):
         real_pool = pool + items_started
         self.item_counts[self.player] = self.get_item_counts(pool=real_pool)
         self.item_counts_progression[self.player] = self.get_item_counts(pool=real_pool, only_progression=True)
+        self.category_index = CategoryIndex(self.item_name_to_item, self.item_counts_progression[self.player], self.get_category_counters())
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
         name = before_create_item(name, self, self.multiworld, self.player)
@@ -271,14 +281,19 @@ class ManualWorld(World):
 
         return item_object
 
-    # Item Value need a tweaked collect and remove:
+    # Item Value and the category counters need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
         manual_item = self.item_name_to_item.get(item.name, {})
         if change and manual_item.get("value"):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
+        if change:
+            for key in self.get_category_counters().item_counter_keys.get(item.name, ()):
+                state.prog_items[item.player][key] += 1
         after_collect_item(self, state, change, item)
+        if change:
+            invalidate_rule_results(state, item.player)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
@@ -287,7 +302,12 @@ class ManualWorld(World):
         if change and manual_item.get("value"):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
+        if change:
+            for key in self.get_category_counters().item_counter_keys.get(item.name, ()):
+                state.prog_items[item.player][key] -= 1
         after_remove_item(self, state, change, item)
+        if change:
+            invalidate_rule_results(state, item.player)
         return change
 
     def set_rules(self):
@@ -296,6 +316,7 @@ class ManualWorld(World):
         set_rules(self, self.multiworld, self.player)
 
         after_set_rules(self, self.multiworld, self.player)
+        self.resolve_count_keywords()
 
     def generate_basic(self):
         before_generate_basic(self, self.multiworld, self.player)
@@ -366,6 +387,7 @@ class ManualWorld(World):
 
 
         after_generate_basic(self, self.multiworld, self.player)
+        self.resolve_count_keywords()
 
         # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
         if enable_region_diagram:
@@ -396,9 +418,16 @@ class ManualWorld(World):
         with open(os.path.join(output_directory, filename), 'wb') as f:
             f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
 
+        if self.rule_profiler is not None:
+            self.rule_profiler.dump("until generate_output")
+
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+        # the spoiler playthrough is made after generate_output
+        if self.rule_profiler is not None:
+            self.rule_profiler.dump("since generate_output")
+
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -500,13 +529,42 @@ class ManualWorld(World):
             return self.item_counts.get(player, Counter())
 
 
+    def get_category_index(self) -> CategoryIndex:
+        """The category -> (item names, pool count) index of this world's items, counted from get_item_counts(only_progression=True).\n
+        It's built at the end of create_items, and built again if the item counts are replaced or edited after that."""
+        items_counts = self.get_item_counts(only_progression=True)
+        if self.category_index is None or self.category_index.items_counts != items_counts:
+            self.category_index = CategoryIndex(self.item_name_to_item, items_counts, self.get_category_counters())
+        return self.category_index
+
+    def get_category_counters(self) -> CategoryCounters:
+        """The keys of the category counters collect and remove keep in state.prog_items.
+        They only depend on the item table, so unlike the category index they're built once and kept whatever the pool is."""
+        if self.category_counters is None:
+            self.category_counters = CategoryCounters(self.item_name_to_item)
+        return self.category_counters
+
+    def resolve_count_keywords(self):
+        """Work out again what the 'all', 'half' and '%' counts of the rules stand for, if the item counts were replaced or edited since they were.
+        Called after the hooks that run once the rules are made. A hook that changes the item counts at any other time should call it as well."""
+        if self.count_keywords is not None:
+            self.count_keywords.resolve()
+
+    def evaluate_location_rules(self, state: CollectionState) -> dict[str, bool]:
+        """Check the access rule of every location of the player against the state in one batch, as {location name: rule met}.\n
+        Much faster than calling each location's rule when there are thousands of them (see BatchRules.LocationRuleBatch).
+        The rules are read the first time this is called, so it has to be after set_rules."""
+        if self.location_rule_batch is None:
+            self.location_rule_batch = LocationRuleBatch(self, self.multiworld.get_locations(self.player))
+        return self.location_rule_batch.evaluate_by_name(state)
+
     def client_data(self):
         return {
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
+            'items': {name: dict(item) for name, item in self.item_name_to_item.items()},
+            'locations': {name: dict(location) for name, location in self.location_name_to_location.items()},
             # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
             'regions': region_table,
             'categories': category_table
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from .LinkLink import LinkLinkLocations, LocationTable
+
 
 ITEM_TABLE = []
 MAX_PLAYERS = 40
@@ -13,12 +16,9 @@ def after_load_game_file(game_table: dict) -> dict:
 # called after the items.json file has been loaded, before any item loading or processing has occurred
 # if you need access to the items after processing to add ids, etc., you should use the hooks in World.py
 def after_load_item_file(item_table: list) -> list:
-    # Store a reference to this
-    for i, extra_file in enumerate(extra_item_files):
-        from ..Data import convert_to_list
-        from ..Helpers import load_data_file
-
-        new_table = convert_to_list(load_data_file(extra_file), "data")
+    # The extra files are read and decoded at the same time, then get their ID block in list order,
+    # so the IDs don't depend on which file finished loading first
+    for i, new_table in enumerate(load_extra_item_files(extra_item_files)):
         new_table[0]["id"] = (i + 1) * 1000  # Plenty of room for expansion
         item_table.extend(new_table)
 
@@ -28,6 +28,17 @@ def after_load_item_file(item_table: list) -> list:
     ITEM_TABLE.extend(item_table)
     return item_table
 
+def load_extra_item_files(filenames: list[str]) -> list[list]:
+    """Load the item files on a thread pool, returning their items in the same order as the filenames"""
+    from ..Data import convert_to_list
+    from ..Helpers import load_data_file
+
+    if len(filenames) < 2:
+        return [convert_to_list(load_data_file(filename), "data") for filename in filenames]
+
+    with ThreadPoolExecutor(max_workers=min(len(filenames), 8)) as executor:
+        return list(executor.map(lambda filename: convert_to_list(load_data_file(filename), "data"), filenames))
+
 # NOTE: Progressive items are not currently supported in Manual. Once they are,
 #       this hook will provide the ability to meaningfully change those.
 def after_load_progressive_item_file(progressive_item_table: list) -> list:
@@ -36,21 +47,9 @@ def after_load_progressive_item_file(progressive_item_table: list) -> list:
 # called after the locations.json file has been loaded, before any location loading or processing has occurred
 # if you need access to the locations after processing to add ids, etc., you should use the hooks in World.py
 def after_load_location_file(location_table: list) -> list:
-    for item in ITEM_TABLE:
-        if 'linklink' in item:
-            count = item['count']
-            digit = len(str(count + 1))
-            players_digits = len(str(MAX_PLAYERS))
-
-            for i in range(1, count + 1):
-                for j in range(1, MAX_PLAYERS + 1):
-                    location_table.append({
-                        "name": f"{item['name']} {str(i).zfill(digit)} Player {str(j).zfill(players_digits)}",
-                        "region": f"{item['name']} {str(i).zfill(digit)}",
-                        "category": [item['name']],
-                        "requires": "",
-                        "linklink": item['linklink'],
-                    })
+    # The "Item NN Player MM" locations are computed on demand rather than stored, see LinkLinkLocations
+    location_table = LocationTable(location_table, LinkLinkLocations(ITEM_TABLE, MAX_PLAYERS))
+
     digit = len(str(FREE_ITEMS + 1))
     for i in range(1, FREE_ITEMS + 1):
         location_table.append({
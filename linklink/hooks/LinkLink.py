@@ -0,0 +1,312 @@
+from bisect import bisect_right
+from collections.abc import Mapping, MutableSequence, Sequence
+from itertools import accumulate, chain
+from typing import Iterator, Optional
+
+from ..Records import LocationRecord
+
+
+class LinkLinkLocations(Sequence):
+    """Every "Item NN Player MM" location: one per player slot, for every copy of every linklink item.\n
+    The records are computed from (item index, copy, slot) whenever they are asked for instead of being stored,
+    so this only keeps a reference to the linklink items themselves, and the names of the items whose locations were asked for."""
+
+    def __init__(self, items: list[dict], max_players: int):
+        self.items = [item for item in items if 'linklink' in item]
+        self.max_players = max_players
+        self.players_digits = len(str(max_players))
+        self.first_id: Optional[int] = None # Set by Locations.py when it assigns the location ids
+        self.slot_suffixes = [f" Player {str(slot).zfill(self.players_digits)}" for slot in range(1, max_players + 1)]
+        # The location names of each item, made all at once the first time one of them is needed (see get_item_names)
+        self.item_location_names: list[Optional[tuple[str, ...]]] = [None] * len(self.items)
+
+        self.item_indexes: dict[str, int] = {}
+        for item_index, item in enumerate(self.items):
+            self.item_indexes.setdefault(item['name'], item_index)
+
+        # The index of the first location of each item, followed by the total number of locations
+        self.offsets = [0, *accumulate(item['count'] * max_players for item in self.items)]
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("linklink location index out of range")
+
+        return self.get_record(*self.get_parts(index))
+
+    def __iter__(self) -> Iterator[dict]:
+        for item_index, item in enumerate(self.items):
+            for copy in range(1, item['count'] + 1):
+                for slot in range(1, self.max_players + 1):
+                    yield self.get_record(item_index, copy, slot)
+
+    def get_parts(self, index: int) -> tuple[int, int, int]:
+        """Return the (item index, copy, player slot) of the location at this index"""
+        item_index = bisect_right(self.offsets, index) - 1
+        copy, slot = divmod(index - self.offsets[item_index], self.max_players)
+        return item_index, copy + 1, slot + 1
+
+    def get_index(self, item_index: int, copy: int, slot: int) -> int:
+        return self.offsets[item_index] + (copy - 1) * self.max_players + slot - 1
+
+    def get_id(self, item_index: int, copy: int, slot: int) -> int:
+        return self.first_id + self.get_index(item_index, copy, slot)
+
+    def decode_id(self, location_id: int) -> Optional[tuple[int, int, int]]:
+        """Return the (item index, copy, player slot) of the location with this id, or None if it isn't one of the linklink locations"""
+        if self.first_id is None or not isinstance(location_id, int):
+            return None
+
+        index = location_id - self.first_id
+        if not 0 <= index < len(self):
+            return None
+
+        return self.get_parts(index)
+
+    def get_region_name(self, item_index: int, copy: int) -> str:
+        item = self.items[item_index]
+        digit = len(str(item['count'] + 1))
+        return f"{item['name']} {str(copy).zfill(digit)}"
+
+    def get_name(self, item_index: int, copy: int, slot: int) -> str:
+        return self.get_item_names(item_index)[(copy - 1) * self.max_players + slot - 1]
+
+    def make_name(self, item_index: int, copy: int, slot: int) -> str:
+        return self.get_region_name(item_index, copy) + self.slot_suffixes[slot - 1]
+
+    def get_item_names(self, item_index: int) -> tuple[str, ...]:
+        """Every location name of one linklink item, in location order.\n
+        They're all made the first time any of them is needed and kept from then on,
+        so the lookups and location groups built from them all share the same string objects."""
+        names = self.item_location_names[item_index]
+        if names is None:
+            names = self.item_location_names[item_index] = tuple(
+                region + suffix
+                for region in (self.get_region_name(item_index, copy) for copy in range(1, self.items[item_index]['count'] + 1))
+                for suffix in self.slot_suffixes
+            )
+        return names
+
+    def get_record(self, item_index: int, copy: int, slot: int) -> LocationRecord:
+        item = self.items[item_index]
+        region = self.get_region_name(item_index, copy)
+        record = {
+            "name": self.get_name(item_index, copy, slot),
+            "region": region,
+            "category": [item['name']],
+            "requires": "",
+            "linklink": item['linklink'],
+        }
+        if self.first_id is not None:
+            record["id"] = self.get_id(item_index, copy, slot)
+        return LocationRecord(record)
+
+    def find(self, name: str) -> Optional[int]:
+        """Return the index of the location with this name, or None if it isn't one of the linklink locations"""
+        if not isinstance(name, str):
+            return None
+
+        region, _, slot = name.rpartition(" Player ")
+        item_name, _, copy = region.rpartition(" ")
+        item_index = self.item_indexes.get(item_name)
+        if item_index is None or not copy.isdigit() or not slot.isdigit():
+            return None
+
+        copy, slot = int(copy), int(slot)
+        if not 1 <= copy <= self.items[item_index]['count'] or not 1 <= slot <= self.max_players:
+            return None
+
+        # Catches names with the right numbers but the wrong zero padding
+        if self.make_name(item_index, copy, slot) != name:
+            return None
+
+        return self.get_index(item_index, copy, slot)
+
+    def by_name(self) -> "LinkLinkLocationsByName":
+        return LinkLinkLocationsByName(self)
+
+    def ids_by_name(self) -> "LinkLinkLocationIds":
+        return LinkLinkLocationIds(self)
+
+    def names_by_id(self) -> "LinkLinkLocationNames":
+        return LinkLinkLocationNames(self)
+
+    def names(self) -> Iterator[str]:
+        for item_index in range(len(self.items)):
+            yield from self.get_item_names(item_index)
+
+    def ids(self) -> range:
+        """The ids of the locations, in the same order as names(). They're one contiguous block"""
+        if self.first_id is None:
+            return range(0)
+        return range(self.first_id, self.first_id + len(self))
+
+    def item_group(self, item_index: int) -> "LinkLinkLocationGroup":
+        return LinkLinkLocationGroup(self, item_index)
+
+
+class LinkLinkLocationGroup(Sequence):
+    """The location group of one linklink item, which is its block of locations.
+    It's only a range of location indexes until it's read, so the names are made when something asks for them."""
+
+    def __init__(self, locations: LinkLinkLocations, item_index: int):
+        self.locations = locations
+        self.item_index = item_index
+        self.indexes = range(locations.offsets[item_index], locations.offsets[item_index + 1])
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __getitem__(self, index):
+        return self.locations.get_item_names(self.item_index)[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.locations.get_item_names(self.item_index))
+
+    def __contains__(self, name: object) -> bool:
+        index = self.locations.find(name)
+        return index is not None and index in self.indexes
+
+    def __repr__(self) -> str:
+        return f"LinkLinkLocationGroup({self.locations.items[self.item_index]['name']!r}, {len(self)} locations)"
+
+
+class LinkLinkLocationsByName(Mapping):
+    """Read-only name -> record lookup of the linklink locations, without storing either"""
+
+    def __init__(self, locations: LinkLinkLocations):
+        self.locations = locations
+
+    def __getitem__(self, name: str) -> LocationRecord:
+        index = self.locations.find(name)
+        if index is None:
+            raise KeyError(name)
+        return self.locations[index]
+
+    def __contains__(self, name: object) -> bool:
+        return self.locations.find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return self.locations.names()
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+
+class LinkLinkLocationIds(Mapping):
+    """Read-only name -> id lookup of the linklink locations. The id is worked out from the parts of the name."""
+
+    def __init__(self, locations: LinkLinkLocations):
+        self.locations = locations
+
+    def __getitem__(self, name: str) -> int:
+        index = self.locations.find(name)
+        if index is None or self.locations.first_id is None:
+            raise KeyError(name)
+        return self.locations.first_id + index
+
+    def __contains__(self, name: object) -> bool:
+        return self.locations.first_id is not None and self.locations.find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        if self.locations.first_id is None:
+            return iter(())
+        return self.locations.names()
+
+    def __len__(self) -> int:
+        return len(self.locations) if self.locations.first_id is not None else 0
+
+
+class LinkLinkLocationNames(Mapping):
+    """Read-only id -> name lookup of the linklink locations. The name is built from the parts decoded from the id."""
+
+    def __init__(self, locations: LinkLinkLocations):
+        self.locations = locations
+
+    def __getitem__(self, location_id: int) -> str:
+        parts = self.locations.decode_id(location_id)
+        if parts is None:
+            raise KeyError(location_id)
+        return self.locations.get_name(*parts)
+
+    def __contains__(self, location_id: object) -> bool:
+        return self.locations.decode_id(location_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        if self.locations.first_id is None:
+            return iter(())
+        return iter(range(self.locations.first_id, self.locations.first_id + len(self.locations)))
+
+    def __len__(self) -> int:
+        return len(self.locations) if self.locations.first_id is not None else 0
+
+
+class LocationTable(MutableSequence):
+    """A location_table made of the locations from locations.json, then the generated linklink locations,
+    then anything appended afterward (like the free item locations or the game completion location)."""
+
+    def __init__(self, locations: list[dict], generated: LinkLinkLocations):
+        self.locations = locations
+        self.generated = generated
+        self.appended: list[dict] = []
+
+    @property
+    def generated_start(self) -> int:
+        return len(self.locations)
+
+    def __len__(self) -> int:
+        return len(self.locations) + len(self.generated) + len(self.appended)
+
+    def __iter__(self) -> Iterator[dict]:
+        return chain(self.locations, self.generated, self.appended)
+
+    def _find_part(self, index: int) -> tuple[Sequence, int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("location_table index out of range")
+
+        for part in (self.locations, self.generated, self.appended):
+            if index < len(part):
+                return part, index
+            index -= len(part)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        part, index = self._find_part(index)
+        return part[index]
+
+    def __setitem__(self, index: int, value: dict):
+        part, index = self._find_part(index)
+        if part is self.generated:
+            raise TypeError("The generated linklink locations can't be replaced")
+        part[index] = value
+
+    def __delitem__(self, index: int):
+        part, index = self._find_part(index)
+        if part is self.generated:
+            raise TypeError("The generated linklink locations can't be removed")
+        del part[index]
+
+    def insert(self, index: int, value: dict):
+        if index < 0:
+            index = max(index + len(self), 0)
+
+        if index <= len(self.locations):
+            self.locations.insert(index, value)
+        elif index >= len(self.locations) + len(self.generated):
+            self.appended.insert(index - len(self.locations) - len(self.generated), value)
+        else:
+            raise TypeError("Locations can't be inserted between the generated linklink locations")
+
+    def __repr__(self) -> str:
+        return f"LocationTable({len(self.locations)} locations, {len(self.generated)} linklink locations, {len(self.appended)} appended)"
@@ -0,0 +1,82 @@
+import random
+
+from BaseClasses import CollectionState
+from test.TestBase import WorldTestBase
+
+from ..Game import game_name
+from ..Helpers import format_state_prog_items_key, ProgItemsCat
+from ..Records import ItemRecord
+
+# "Key Items" and "key_items" have the same counter key, so neither of them gets a counter
+ITEM_CATEGORIES = {
+    "Sword": ["Weapons"],
+    "Bow": ["Weapons", "Key Items"],
+    "Biggoron's Sword": ["Weapons", "Weapons"],
+    "Shield (Basic)": ["Shields"],
+    "Shield (Mirror)": ["Shields", "key_items"],
+    "Heart Container": ["Key Items"],
+}
+ITEM_NAMES = [*ITEM_CATEGORIES, "Bottle", "Torn Page"]
+
+
+class TestCategoryCounters(WorldTestBase):
+    """ManualWorld.collect and remove keep a counter of each category's items in state.prog_items (see CategoryCounters),
+    which has to match adding up the category's items however they're collected, removed or copied"""
+    game = game_name
+
+    def prepare_world(self):
+        """Give some items categories, linklink has none of its own"""
+        self.world.item_name_to_item = {
+            item_name: ItemRecord({**item, "category": ITEM_CATEGORIES[item_name]}) if item_name in ITEM_CATEGORIES else item
+            for item_name, item in self.world.item_name_to_item.items()
+        }
+        self.world.category_index = None
+        self.world.category_counters = None
+
+    def assertCountersMatch(self, state: CollectionState):
+        items = state.prog_items[self.player]
+        for category, key in self.world.get_category_counters().counter_keys.items():
+            item_names = [item_name for item_name, categories in ITEM_CATEGORIES.items() if category in categories]
+            self.assertEqual(sum(items[item_name] for item_name in item_names), items[key], category)
+
+    def test_counter_keys(self):
+        if not self.constructed:
+            return
+        self.prepare_world()
+        counters = self.world.get_category_counters()
+
+        self.assertEqual({"Weapons": format_state_prog_items_key(ProgItemsCat.CATEGORY, "Weapons"),
+                          "Shields": format_state_prog_items_key(ProgItemsCat.CATEGORY, "Shields")}, counters.counter_keys)
+        self.assertIsNone(counters.get_counter_key("Key Items"))
+        # an item listed twice in a category still only counts once for it
+        self.assertEqual((counters.counter_keys["Weapons"],), counters.item_counter_keys["Biggoron's Sword"])
+        self.assertNotIn("Heart Container", counters.item_counter_keys)
+        # they only depend on the item table, so they're built once whatever happens to the pool
+        self.assertIs(counters, self.world.get_category_counters())
+        self.assertIs(counters, self.world.get_category_index().counters)
+
+    def test_random_changes(self):
+        if not self.constructed:
+            return
+        self.prepare_world()
+        rng = random.Random(1)
+        states = [CollectionState(self.multiworld)]
+        collected: list[list] = [[]]
+
+        for _ in range(3000):
+            index = rng.randrange(len(states))
+            state, items = states[index], collected[index]
+            roll = rng.random()
+            if roll < 0.05 and len(states) < 8:
+                states.append(state.copy())
+                collected.append(list(items))
+            elif roll < 0.4 and items:
+                state.remove(items.pop(rng.randrange(len(items))))
+            else:
+                item = self.world.create_item(rng.choice(ITEM_NAMES))
+                state.collect(item, True)
+                items.append(item)
+            self.assertCountersMatch(state)
+
+        for state in states:
+            self.assertCountersMatch(state)
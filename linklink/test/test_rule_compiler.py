@@ -0,0 +1,252 @@
+import math
+import random
+from unittest import mock
+
+from BaseClasses import CollectionState
+from test.TestBase import WorldTestBase
+
+from ..Game import game_name
+from ..Records import ItemRecord, LocationRecord
+from ..Rules import RuleCompiler, DictRequirement
+from ..hooks import Rules as RulesHooks
+
+
+# The requirement functions the requires below call, put in hooks/Rules.py for the length of each test
+def HasItemBool(state: CollectionState, player: int, item_name: str) -> bool:
+    return state.has(item_name, player)
+
+def ItemCountAtLeast(state: CollectionState, player: int, item_name: str, count: int):
+    return state.count(item_name, player) >= count
+
+def ItemCountNotBool(state: CollectionState, player: int, item_name: str) -> bool:
+    # says it returns a bool but doesn't, so the compiled tree has to fall back to the functions being run first
+    return state.count(item_name, player)
+
+def ItemsText(state: CollectionState, player: int, item_name: str):
+    return f"|{item_name}:2| OR |@Weapons:2|" if state.has(item_name, player) else "(|Bow| AND |@Key Items|)"
+
+def NestedCall(item_name: str):
+    return f"{{HasItemBool({item_name})}}"
+
+def IsEven(count: int) -> bool:
+    return count % 2 == 0
+
+def TwoAsText():
+    return 2
+
+def RaisesError(state: CollectionState, player: int) -> bool:
+    raise ValueError("RaisesError always raises")
+
+REQUIREMENT_FUNCTIONS = {function.__name__: function for function in (HasItemBool, ItemCountAtLeast, ItemCountNotBool, ItemsText, NestedCall,
+                                                                       IsEven, TwoAsText, RaisesError)}
+
+# Some items with quotes and parentheses in their names, and one that isn't in the game at all
+ITEM_NAMES = ["Sword", "Bow", "Biggoron's Sword", "Shield (Basic)", "Shield (Mirror)", "Heart Container", "Not An Item"]
+# "Key Items" and "key_items" have the same counter key, so neither gets a counter and they're added up from their items instead
+ITEM_CATEGORIES = {
+    "Sword": ["Weapons"],
+    "Bow": ["Weapons", "Key Items"],
+    "Biggoron's Sword": ["Weapons"],
+    "Shield (Basic)": ["Shields"],
+    "Shield (Mirror)": ["Shields", "key_items"],
+    "Heart Container": ["Key Items"],
+}
+CATEGORY_NAMES = ["Weapons", "Shields", "Key Items", "key_items", "Not A Category"]
+
+ITEM_COUNTS = ["", ":0", ":1", ":2", ": 3 ", ":-1", ":ALL", ":half", ":50%", ":150%", ":x", ":1.5", ":%"]
+# A function that says it returns a bool is only called when the rest of the requires doesn't already decide it,
+# so ItemCountNotBool and RaisesError are left to REQUIRES_STRINGS, where they're always reached
+FUNCTION_CALLS = ["{HasItemBool(Sword)}", "{HasItemBool(Not An Item)}", "{ItemCountAtLeast(Bow, 2)}", "{ItemsText(Bow)}", "{NestedCall(Bow)}",
+                  "{IsEven(2)}", "{IsEven(3)}", "{TwoAsText()}", "{NoSuchFunction()}", "{OptOne(|Sword:2|)}", "{OptAll(|@Weapons:5| AND |Bow:3|)}"]
+OPERATORS = [" AND ", " OR ", " and ", " or ", "AND", " & ", " | "]
+
+REQUIRES_STRINGS = [
+    "", " ", "()", "0", "1", "2", "!1", "!(0)", "!!1",
+    "|Sword|", "|Sword:2| AND |Bow|", "|Sword| OR |Bow| AND |Shield (Basic)|", "(|Sword| OR |Bow|) AND |Shield (Basic)|",
+    "((|Sword:2| AND (|Bow| OR |Biggoron's Sword|)) OR (|Shield (Mirror)| AND !|Heart Container:3|))",
+    "|Sword:ALL| AND |Heart Container:half| OR |Bow:50%|", "|Not An Item:0| AND |Not An Item|", "|Sword:-1|",
+    "|@Weapons:2|", "|@Weapons:all| OR |@Shields:HALF|", "|@Key Items| AND |@key_items|", "|@Shields:0| AND !|@Weapons:3|",
+    "|@Not A Category:0|", "|@Not A Category:-1|", "|@Not A Category:all|", "(|@Weapons:1| OR |@Shields|) AND (|Sword| OR |@Key Items:2|)",
+    "{HasItemBool(Sword)} AND |Bow|", "({HasItemBool(Bow)} OR {HasItemBool(Not An Item)}) AND !|@Weapons:3|",
+    "{ItemCountAtLeast(Heart Container, 2)} OR |Sword|", "{ItemCountNotBool(Bow)} OR |Not An Item|", "{ItemCountNotBool(Sword)} AND |Sword|",
+    "{ItemsText(Sword)} AND |Shield (Basic)|", "{NestedCall(Sword)} OR |Bow|", "{IsEven(4)} AND |Sword|", "{IsEven(5)} OR |Sword|", "{TwoAsText()} AND |Sword|",
+    "{RaisesError()} OR |Not An Item|", "|Sword| AND {NoSuchFunction()}", "{OptOne(|Sword:2|)} AND {OptAll(|@Weapons:5| AND |Bow:3|)}",
+    "|Sword:{IsEven(2)}|", "{HasItemBool(Sword)}{HasItemBool(Bow)}",
+    # Invalid requires, which raise the same errors either way
+    "|Sword| AND", "(|Sword| OR |Bow|", "|Sword| OR |Bow|)", "|Sword:x|", "|@Weapons:x|", "|Sword| |Bow|", "AND |Sword|",
+    "|Sword", "Sword|", "{HasItemBool(Sword)", "|Sword:1.5|", "|@Weapons:%|",
+    # The compiler swaps the |items| for Hangul syllables where the string evaluator puts a 1 or 0, so these have to be left to the string evaluator
+    "|Sword| OR 가", "|각| OR |Sword|", "||Sword||1|1|", "|Bow:1|||Sword|||1|", "|0|||Sword|||1|", "1||Sword:1|||0|",
+]
+
+REQUIRE_DICTS = [
+    ["Sword"], ["Sword:2", "Bow"], ["Sword:0", "Not An Item:0"], ["Not An Item"], ["Sword:-1"],
+    [["Sword", "Bow"], ["Heart Container:2"]], [{"or": ["Sword:2", "Shield (Basic)"]}, {"or": ["Bow"]}],
+    ["Biggoron's Sword", {"or": ["Sword:3"]}, ["Shield (Mirror)", "Bow"]], [[], "Not An Item"], [{"or": []}, "Sword"],
+    {"Sword": 1, "Bow": 2}, ["Sword:2:3"],
+    # Invalid ones, which raise the same errors either way
+    ["Sword:x"], [["Bow:y"]], [{"or": ["Sword", 3]}], [5], [{"and": ["Sword"]}], [{"or": "Sword"}],
+]
+
+
+def get_outcome(rule, state: CollectionState):
+    """What checking the rule gives: its result, or the type and message of the error it raised"""
+    try:
+        return rule(state)
+    except Exception as ex:
+        return type(ex), str(ex)
+
+
+class TestRuleCompiler(WorldTestBase):
+    """The rules set_rules compiles have to give the same result as the string evaluator and check_require_dict they replaced,
+    for every requires and every state, errors included"""
+    game = game_name
+
+    # Each test calls this instead of it being done in world_setup or setUp,
+    # since overriding those makes WorldTestBase run its default tests again for this class (ManualTest already runs them)
+    def prepare_world(self):
+        """Give some items categories (linklink has none of its own) and add the requirement functions to hooks/Rules.py"""
+        self.world.item_name_to_item = {
+            item_name: ItemRecord({**item, "category": ITEM_CATEGORIES[item_name]}) if item_name in ITEM_CATEGORIES else item
+            for item_name, item in self.world.item_name_to_item.items()
+        }
+        self.world.category_index = None
+        self.world.category_counters = None
+
+        functions_patch = mock.patch.multiple(RulesHooks, create=True, **REQUIREMENT_FUNCTIONS)
+        functions_patch.start()
+        self.addCleanup(functions_patch.stop)
+
+    def get_category_result(self, state: CollectionState, category: str, count: str) -> bool:
+        """What the string evaluator made of a lone |@category:count| before it had the category index, worked out from the item table"""
+        item_names = [item["name"] for item in self.world.item_name_to_item.values() if category in item.get("category", [])]
+        pool_count = sum(self.world.get_item_counts(only_progression=True).get(item_name, 0) for item_name in item_names)
+        if count.lower() == "all":
+            required = pool_count
+        elif count.lower() == "half":
+            required = pool_count // 2
+        elif count.endswith("%"):
+            required = math.ceil(pool_count * min(max(float(count[:-1]) / 100, 0), 1))
+        else:
+            required = int(count)
+        # an empty category is never met, even with a count of 0
+        return bool(item_names) and sum(state.count(item_name, self.player) for item_name in item_names) >= required
+
+    def get_states(self) -> list[CollectionState]:
+        rng = random.Random(1)
+        pool = [item for item in self.multiworld.itempool if item.player == self.player and item.advancement]
+        wanted = [item for item in pool if item.name in ITEM_CATEGORIES]
+        states = []
+        for collected in [[], wanted, pool, *(rng.sample(wanted, rng.randrange(len(wanted))) for _ in range(12))]:
+            state = CollectionState(self.multiworld)
+            for item in collected:
+                state.collect(item, True)
+            states.append(state)
+        return states
+
+    def assertSameOutcomes(self, requires, compiled_rule, reference_rule, states: list[CollectionState]):
+        for index, state in enumerate(states):
+            with self.subTest(requires=requires, state=index):
+                self.assertEqual(get_outcome(reference_rule, state), get_outcome(compiled_rule, state))
+
+    def get_random_requires(self, rng: random.Random, depth: int = 0) -> str:
+        if depth > 3 or rng.random() < 0.35:
+            roll = rng.random()
+            if roll < 0.45:
+                return f"|{rng.choice(ITEM_NAMES)}{rng.choice(ITEM_COUNTS)}|"
+            elif roll < 0.7:
+                return f"|@{rng.choice(CATEGORY_NAMES)}{rng.choice(ITEM_COUNTS)}|"
+            elif roll < 0.8:
+                return rng.choice(["0", "1", "2"])
+            return rng.choice(FUNCTION_CALLS)
+
+        requires = self.get_random_requires(rng, depth + 1) + rng.choice(OPERATORS) + self.get_random_requires(rng, depth + 1)
+        roll = rng.random()
+        if roll < 0.3:
+            requires = f"({requires})"
+        elif roll < 0.4:
+            requires = f"!({requires})"
+        elif roll < 0.45:
+            requires = f"!{requires}"
+        return requires
+
+    def test_requires_strings(self):
+        if not self.constructed:
+            return
+        self.prepare_world()
+        compiler = RuleCompiler(self.world, self.multiworld, self.player)
+        reference = RuleCompiler(self.world, self.multiworld, self.player)
+        states = self.get_states()
+
+        rng = random.Random(2)
+        for requires in REQUIRES_STRINGS + [self.get_random_requires(rng) for _ in range(300)]:
+            area = LocationRecord({"name": "Compiled Location", "requires": requires})
+            compiled_rule = compiler.compile_area(area)
+            if requires:
+                reference_rule = lambda state: reference.evaluate_requires_string(state, reference.run_functions(state, requires, area), area)
+            else:
+                reference_rule = lambda state: True
+            self.assertSameOutcomes(requires, compiled_rule, reference_rule, states)
+
+    def test_category_requires(self):
+        # The string evaluator reads the categories from the same CategoryIndex the compiled rules do, so they're checked against the item table too
+        if not self.constructed:
+            return
+        self.prepare_world()
+        compiler = RuleCompiler(self.world, self.multiworld, self.player)
+        states = self.get_states()
+
+        for category in CATEGORY_NAMES:
+            for count in ["1", "0", "2", "3", "5", "all", "HALF", "50%", "150%", "0%"]:
+                requires = f"|@{category}:{count}|"
+                compiled_rule = compiler.compile_area(LocationRecord({"name": "Compiled Location", "requires": requires}))
+                for index, state in enumerate(states):
+                    with self.subTest(requires=requires, state=index):
+                        self.assertEqual(self.get_category_result(state, category, count), compiled_rule(state))
+
+    def test_requires_dicts(self):
+        if not self.constructed:
+            return
+        self.prepare_world()
+        compiler = RuleCompiler(self.world, self.multiworld, self.player)
+        states = self.get_states()
+
+        for requires in REQUIRE_DICTS:
+            compiled_rule = compiler.compile_area({"requires": requires})
+            reference_rule = lambda state: compiler.check_require_dict(state, requires)
+            self.assertSameOutcomes(requires, compiled_rule, reference_rule, states)
+
+        # only the ones check_require_dict can fail on are left to it
+        for requires in REQUIRE_DICTS[:12]:
+            self.assertNotIsInstance(compiler.compile_area({"requires": requires}), DictRequirement, requires)
+
+    def test_item_counts_edited(self):
+        # A hook can edit the item counts in place rather than replace them, which has to change the 'all', 'half' and '%' counts all the same
+        if not self.constructed:
+            return
+        self.prepare_world()
+        compiler = RuleCompiler(self.world, self.multiworld, self.player)
+        requires = ["|Sword:all|", "|Bow:half|", "|@Weapons:all|", "|@Key Items:50%|"]
+        compiled_rules = [compiler.compile_area(LocationRecord({"name": "Compiled Location", "requires": text})) for text in requires]
+        self.world.count_keywords = compiler.count_keywords
+        self.addCleanup(setattr, self.world, "count_keywords", None)
+
+        items_counts = self.world.get_item_counts(only_progression=True)
+        original_counts = dict(items_counts)
+        self.addCleanup(lambda: (items_counts.clear(), items_counts.update(original_counts)))
+        items_counts["Sword"] += 2
+        items_counts["Bow"] += 3
+        items_counts["Heart Container"] += 1
+        self.world.resolve_count_keywords()
+        self.assertIs(items_counts, self.world.get_item_counts(only_progression=True))
+
+        states = self.get_states()
+        for text, compiled_rule in zip(requires, compiled_rules):
+            reference_rule = lambda state: compiler.evaluate_requires_string(state, text, {"name": "Compiled Location"})
+            self.assertSameOutcomes(text, compiled_rule, reference_rule, states)
+        for category in ["Weapons", "Key Items"]:
+            self.assertEqual(sum(items_counts[item_name] for item_name, categories in ITEM_CATEGORIES.items() if category in categories),
+                             self.world.get_category_index()[category].pool_count)
+        for index, state in enumerate(states):
+            self.assertEqual(self.get_category_result(state, "Weapons", "all"), compiled_rules[2](state), index)
+            self.assertEqual(self.get_category_result(state, "Key Items", "50%"), compiled_rules[3](state), index)
@@ -0,0 +1,95 @@
+import random
+
+from BaseClasses import CollectionState
+from test.TestBase import WorldTestBase
+
+from ..Game import game_name
+from ..Rules import RuleCompiler, CachedRequirement
+
+REQUIRES = ["|Sword:2| OR |Not An Item|", "|Sword:2| OR (|Bow| AND |Heart Container:3|)", "|Bow| AND !|Shield (Basic)|", "(|Sword| AND |Bottle:2|) OR |Torn Page:ALL|"]
+ITEM_NAMES = ["Sword", "Bow", "Heart Container", "Shield (Basic)", "Bottle", "Torn Page"]
+
+
+class TestRuleResults(WorldTestBase):
+    """The rules that remember their result in each CollectionState (see CachedRequirement) have to give the same answer
+    as checking their requirement again, whatever gets collected, removed or copied in between"""
+    game = game_name
+
+    def get_rules(self) -> list[CachedRequirement]:
+        compiler = RuleCompiler(self.world, self.multiworld, self.player)
+        rules = [compiler.cache(compiler.compile_area({"requires": requires})) for requires in REQUIRES]
+        for rule in rules:
+            self.assertIsInstance(rule, CachedRequirement)
+        return rules
+
+    def assertResultsUpToDate(self, rules: list[CachedRequirement], state: CollectionState):
+        for rule in rules:
+            self.assertEqual(rule.requirement(state), rule(state), rule)
+
+    def test_collect_and_remove(self):
+        if not self.constructed:
+            return
+        rule = self.get_rules()[0]
+        state = CollectionState(self.multiworld)
+        swords = [self.world.create_item("Sword") for _ in range(2)]
+
+        self.assertFalse(rule(state))
+        self.assertIn(rule, state.manual_rule_results[self.player])
+
+        state.collect(swords[0], True)
+        self.assertNotIn(rule, state.manual_rule_results[self.player])
+        self.assertFalse(rule(state))
+        state.collect(swords[1], True)
+        self.assertTrue(rule(state))
+        state.remove(swords[1])
+        self.assertFalse(rule(state))
+
+    def test_copy(self):
+        if not self.constructed:
+            return
+        rule = self.get_rules()[0]
+        state = CollectionState(self.multiworld)
+        state.collect(self.world.create_item("Sword"), True)
+        self.assertFalse(rule(state))
+
+        # the copy has a cache of its own, so what either of them collects doesn't change what the other one remembers
+        copy = state.copy()
+        self.assertIsNot(state.manual_rule_results, copy.manual_rule_results)
+        copy.collect(self.world.create_item("Sword"), True)
+        self.assertTrue(rule(copy))
+        self.assertFalse(rule(state))
+
+        state.collect(self.world.create_item("Sword"), True)
+        state.collect(self.world.create_item("Sword"), True)
+        copy.remove(self.world.create_item("Sword"))
+        self.assertTrue(rule(state))
+        self.assertFalse(rule(copy))
+
+    def test_random_changes(self):
+        if not self.constructed:
+            return
+        rules = self.get_rules()
+        rng = random.Random(1)
+        states = [CollectionState(self.multiworld)]
+        collected: list[list] = [[]]
+
+        for _ in range(2000):
+            index = rng.randrange(len(states))
+            state, items = states[index], collected[index]
+            roll = rng.random()
+            if roll < 0.05 and len(states) < 8:
+                states.append(state.copy())
+                collected.append(list(items))
+            elif roll < 0.4 and items:
+                state.remove(items.pop(rng.randrange(len(items))))
+            else:
+                item = self.world.create_item(rng.choice(ITEM_NAMES))
+                state.collect(item, True)
+                items.append(item)
+
+            # check some of the rules in some of the states, so the others keep results from before
+            for state in rng.sample(states, rng.randrange(1, len(states) + 1)):
+                self.assertResultsUpToDate(rng.sample(rules, rng.randrange(1, len(rules) + 1)), state)
+
+        for state in states:
+            self.assertResultsUpToDate(rules, state)